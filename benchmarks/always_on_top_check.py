@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Always-on-top check: the saved setting is applied when the window maps.
+
+Starts the app with always_on_top enabled in a fresh HOME, under a
+window manager that supports EWMH (openbox by default), and waits for
+the window manager to report _NET_WM_STATE_ABOVE on the app's window.
+Without a DISPLAY a private Xvfb server is started.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from startup_benchmark import PROJECT_ROOT, start_xvfb, write_tasks
+
+sys.path.insert(0, str(PROJECT_ROOT / 'src'))
+from x11_window import X11Connection
+
+def wait_for_above(x11, timeout):
+    """Seconds until a managed window is kept above, or None on timeout"""
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        if any(x11.is_above(window) for window in x11.client_windows()):
+            return time.monotonic() - start
+        time.sleep(0.02)
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that always-on-top is applied at startup")
+    parser.add_argument('--executable', help="packaged executable to launch (default: run src/main.py)")
+    parser.add_argument('--wm', default='openbox', help="window manager to run (default: openbox)")
+    parser.add_argument('--timeout', type=float, default=20, help="seconds to wait for the window")
+    args = parser.parse_args()
+    
+    if args.executable:
+        command = [str(Path(args.executable).resolve())]
+    else:
+        command = [sys.executable, str(PROJECT_ROOT / 'src' / 'main.py')]
+    if shutil.which('dbus-run-session'):
+        # A private bus keeps an already running instance from taking the launch
+        command = ['dbus-run-session', '--'] + command
+    if not shutil.which(args.wm):
+        print(f"Window manager {args.wm} is not installed")
+        return 2
+    
+    env = dict(os.environ)
+    xvfb = None
+    if not env.get('DISPLAY'):
+        xvfb, env['DISPLAY'] = start_xvfb()
+    env['GDK_BACKEND'] = 'x11'
+    
+    processes = []
+    x11 = None
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            config_dir = Path(home) / '.config' / 'task-tracker'
+            config_dir.mkdir(parents=True)
+            (config_dir / 'settings.json').write_text(json.dumps({'always_on_top': True}))
+            write_tasks(home, 10)
+            run_env = dict(env, HOME=home, XDG_CONFIG_HOME=f"{home}/.config", XDG_CACHE_HOME=f"{home}/.cache")
+            
+            processes.append(subprocess.Popen([args.wm], env=run_env,
+                                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+            time.sleep(0.5)
+            processes.append(subprocess.Popen(command, cwd=home, env=run_env,
+                                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+            
+            x11 = X11Connection(env['DISPLAY'])
+            elapsed = wait_for_above(x11, args.timeout)
+    finally:
+        if x11:
+            x11.close()
+        for process in reversed(processes):
+            process.terminate()
+            process.wait()
+        if xvfb:
+            xvfb.terminate()
+            xvfb.wait()
+    
+    if elapsed is None:
+        print(f"❌ Window was not kept above within {args.timeout:.0f} s")
+        return 1
+    print(f"✅ Window kept above {elapsed * 1000:.0f} ms after launch")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
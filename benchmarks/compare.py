@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files written by run_benchmarks.py.
+
+Prints every metric side by side and exits with status 1 when any metric
+got slower (or larger) than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+# Metrics where a higher value is worse
+METRICS = ('load_ms', 'parse_ms', 'toggle_ms', 'rewrite_ms', 'peak_mib', 'rows_ms', 'first_frame_ms')
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline")
+    parser.add_argument('baseline', help="baseline JSON file")
+    parser.add_argument('current', help="current JSON file")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="allowed current/baseline ratio before failing (default: 1.25)")
+    parser.add_argument('--min-ms', type=float, default=1.0,
+                        help="ignore timings below this many milliseconds, they are mostly noise (default: 1)")
+    args = parser.parse_args()
+    
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)['results']
+    
+    regressions = []
+    print(f"{'scenario':<10} {'metric':<15} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name in sorted(set(baseline) & set(current)):
+        for metric in METRICS:
+            if metric not in baseline[name] or metric not in current[name]:
+                continue
+            old, new = baseline[name][metric], current[name][metric]
+            ratio = new / old if old else float('inf')
+            noisy = metric.endswith('_ms') and max(old, new) < args.min_ms
+            flag = ''
+            if ratio > args.threshold and not noisy:
+                flag = '  ❌'
+                regressions.append((name, metric, ratio))
+            print(f"{name:<10} {metric:<15} {old:>10.2f} {new:>10.2f} {ratio:>6.2f}x{flag}")
+    
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.2f}x")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Synthetic markdown task file generator for the benchmarks.
+
+Files mix headings, prose and task lines. ``density`` is the fraction of
+lines that are tasks and ``depth`` is the deepest nesting level, so the
+parser and the view can be exercised on realistic shapes as well as
+pathological ones.
+"""
+
+import argparse
+import random
+import sys
+
+WORDS = ("review update write fix check plan design deploy test refactor release draft "
+         "notes budget meeting report backlog invoice docs parser window settings cache").split()
+
+def generate_markdown(num_tasks: int, density: float = 0.5, depth: int = 1, seed: int = 0) -> str:
+    """Return markdown text containing num_tasks tasks"""
+    rng = random.Random(seed)
+    lines = []
+    level = 0
+    tasks = 0
+    
+    while tasks < num_tasks:
+        if len(lines) % 60 == 0:
+            lines.append(f"## Section {len(lines) // 60 + 1}")
+            level = 0
+        elif rng.random() < density:
+            # Random walk over the nesting level, one step at a time
+            level = max(0, min(depth - 1, level + rng.choice((-1, 0, 1))))
+            status = 'x' if rng.random() < 0.4 else ' '
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 9)))
+            lines.append(f"{'  ' * level}- [{status}] {words.capitalize()} #{tasks}")
+            tasks += 1
+        else:
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 14))))
+    
+    return "\n".join(lines) + "\n"
+
+def write_markdown(file_path, num_tasks: int, density: float = 0.5, depth: int = 1, seed: int = 0):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(generate_markdown(num_tasks, density, depth, seed))
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic markdown task file")
+    parser.add_argument('output', help="file to write")
+    parser.add_argument('--tasks', type=int, default=10_000, help="number of tasks (default: 10000)")
+    parser.add_argument('--density', type=float, default=0.5, help="fraction of lines that are tasks (default: 0.5)")
+    parser.add_argument('--depth', type=int, default=1, help="maximum nesting depth (default: 1)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args()
+    
+    write_markdown(args.output, args.tasks, args.density, args.depth, args.seed)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
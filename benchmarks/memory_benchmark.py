@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the task store.
+
+Compares the memory held after loading a synthetic task file with the
+columnar TaskParser against the previous representation: one str per line
+from readlines() plus one Python object per task.
+"""
+
+import argparse
+import gc
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from task_parser import TaskParser
+
+class LegacyTask:
+    def __init__(self, text, completed, line_number, indent=""):
+        self.text = text
+        self.completed = completed
+        self.line_number = line_number
+        self.indent = indent
+
+LEGACY_PATTERN = re.compile(r'^(\s*)-\s\[([ x])\]\s(.+)$')
+
+def load_legacy(file_path):
+    """Line-by-line parse that keeps file_lines and per-task objects"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        file_lines = f.readlines()
+    
+    tasks = []
+    for line_num, line in enumerate(file_lines):
+        match = LEGACY_PATTERN.match(line.rstrip('\n'))
+        if match:
+            tasks.append(LegacyTask(match.group(3), match.group(2) == 'x', line_num, match.group(1)))
+    return file_lines, tasks
+
+def load_store(file_path):
+    parser = TaskParser()
+    parser.load_file(str(file_path))
+    return parser
+
+def write_task_file(file_path, num_tasks):
+    """Write num_tasks tasks with a note line after every fourth one"""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for i in range(num_tasks):
+            status = 'x' if i % 3 == 0 else ' '
+            indent = '  ' * (i % 3)
+            f.write(f"{indent}- [{status}] Task number {i} with a short description\n")
+            if i % 4 == 0:
+                f.write(f"Notes for task {i}\n")
+
+def measure(load, file_path):
+    """Return (retained bytes, peak bytes, seconds) for one load"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load(file_path)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak, elapsed
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('sizes', nargs='*', type=int, default=[100_000, 1_000_000],
+                            help='number of tasks per synthetic file')
+    args = arg_parser.parse_args()
+    
+    mib = 1024 * 1024
+    print(f"{'tasks':>10} {'file MiB':>9} {'engine':>8} {'held MiB':>9} {'peak MiB':>9} {'seconds':>8}")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for num_tasks in args.sizes:
+            file_path = Path(temp_dir) / f"tasks-{num_tasks}.md"
+            write_task_file(file_path, num_tasks)
+            file_size = file_path.stat().st_size
+            
+            results = {}
+            for name, load in (('legacy', load_legacy), ('store', load_store)):
+                results[name] = measure(load, file_path)
+                current, peak, elapsed = results[name]
+                print(f"{num_tasks:>10} {file_size / mib:>9.1f} {name:>8} {current / mib:>9.1f} {peak / mib:>9.1f} {elapsed:>8.2f}")
+            
+            print(f"{'':>10} reduction: {results['legacy'][0] / results['store'][0]:.1f}x less memory held")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
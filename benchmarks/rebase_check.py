@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Rebase check: queued changes land on the right line after an outside edit.
+
+Each case loads a file, queues toggles or removals, then changes the
+file behind the parser's back the way another editor or a script would
+and flushes. The file must end up with the queued changes applied to
+the lines they were made on, even where an identical line sits closer
+to the old line number, or with the change dropped when the line it
+was made on can't be told apart from its look-alikes any more.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from startup_benchmark import PROJECT_ROOT
+
+sys.path.insert(0, str(PROJECT_ROOT / 'src'))
+from task_parser import TaskParser
+
+def edit_outside(path, text):
+    """Rewrite path with a new mtime, as another program saving it would"""
+    stat = os.stat(path)
+    path.write_text(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+def lines_inserted_above(parser, path):
+    # The second "dup" is toggled, then two lines are added at the top
+    parser.update_task_status(2, True)
+    edit_outside(path, "new 1\nnew 2\n- [ ] dup\n- [ ] x\n- [ ] dup\n")
+
+def removal_before_toggle(parser, path):
+    # "b" is removed, so the second "dup" is task 1 by the time it is
+    # checked; a line is then appended elsewhere
+    parser.remove_tasks([1])
+    parser.update_task_status(1, True)
+    edit_outside(path, "- [ ] dup\n- [x] b\n- [ ] dup\n- [ ] outside\n")
+
+def look_alike_removed(parser, path):
+    # One of three identical lines goes away elsewhere, so which one was
+    # toggled can't be known; the toggle is dropped
+    parser.update_task_status(1, True)
+    edit_outside(path, "- [ ] same\n- [ ] same\n- [ ] end\n")
+
+CASES = [
+    ("lines inserted above", "- [ ] dup\n- [ ] x\n- [ ] dup\n", lines_inserted_above,
+     "new 1\nnew 2\n- [ ] dup\n- [ ] x\n- [x] dup\n"),
+    ("removal before toggle", "- [ ] dup\n- [x] b\n- [ ] dup\n", removal_before_toggle,
+     "- [ ] dup\n- [x] dup\n- [ ] outside\n"),
+    ("look-alike removed", "- [ ] same\n- [ ] same\n- [ ] same\n- [ ] end\n", look_alike_removed,
+     "- [ ] same\n- [ ] same\n- [ ] end\n"),
+]
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'tasks.md'
+        for name, original, change, expected in CASES:
+            path.write_text(original)
+            parser = TaskParser()
+            parser.load_file(str(path))
+            change(parser, path)
+            parser.flush()
+            result = path.read_text()
+            if result == expected:
+                print(f"✅ {name}")
+            else:
+                failures += 1
+                print(f"❌ {name}: expected {expected!r}, got {result!r}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the parser, the save path and list rendering.
+
+For every scenario a synthetic file is generated and the following are
+measured (median of several repeats, in milliseconds):
+  
+  load_ms          TaskParser.load_file
+  parse_ms         TaskParser._parse_tasks on already loaded content
+  toggle_ms        update_task_status + flush (in-place status patch)
+  rewrite_ms       _save_file (atomic full rewrite)
+  peak_mib         peak traced Python memory while loading
+  rows_ms          refresh_task_list on a real window (needs GTK)
+  first_frame_ms   window present to first painted frame (needs GTK)
+
+Row timings run under the current display, or a private Xvfb server
+when there is none, and are skipped when GTK is not available. Results
+are written as JSON for compare.py.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / 'src'))
+sys.path.insert(0, str(BENCH_DIR))
+
+from generate import write_markdown
+from task_parser import TaskParser
+
+# name: (tasks, density, depth)
+SCENARIOS = {
+    'small': (1_000, 0.5, 1),
+    'medium': (10_000, 0.5, 1),
+    'large': (50_000, 0.5, 1),
+    'sparse': (10_000, 0.1, 1),
+    'dense': (10_000, 0.9, 1),
+    'nested': (10_000, 0.5, 6),
+}
+QUICK_SCENARIOS = ('small', 'medium')
+
+def median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+def bench_parser(file_path, repeat):
+    results = {}
+    results['load_ms'] = median_ms(lambda: TaskParser().load_file(str(file_path)), repeat)
+    
+    parser = TaskParser()
+    parser.load_file(str(file_path))
+    results['tasks'] = len(parser.get_tasks())
+    results['parse_ms'] = median_ms(parser._parse_tasks, repeat)
+    
+    # Toggle a task in the middle of the file and write it out
+    middle = len(parser.get_tasks()) // 2
+    def toggle():
+        parser.update_task_status(middle, not parser.get_tasks()[middle].completed)
+        parser.flush()
+    results['toggle_ms'] = median_ms(toggle, repeat)
+    results['rewrite_ms'] = median_ms(parser._save_file, repeat)
+    
+    gc.collect()
+    tracemalloc.start()
+    TaskParser().load_file(str(file_path))
+    results['peak_mib'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return results
+
+def bench_rows(file_paths, repeat):
+    """Time row building in a real window; returns {} when GTK is unavailable"""
+    try:
+        import gi
+        gi.require_version('Gtk', '4.0')
+        from gi.repository import Gtk, Gio, GLib
+        from main import TaskTrackerWindow
+    except (ImportError, ValueError) as e:
+        print(f"Skipping row benchmarks: {e}")
+        return {}
+    
+    results = {}
+    
+    def on_activate(app):
+        window = TaskTrackerWindow(app)
+        pending = list(file_paths.items())
+        
+        def next_scenario():
+            if not pending:
+                app.quit()
+                return False
+            name, file_path = pending.pop(0)
+            window.parser.load_file(str(file_path))
+            rows_ms = median_ms(window.refresh_task_list, repeat)
+            
+            start = time.perf_counter()
+            def on_after_paint(frame_clock):
+                frame_clock.disconnect_by_func(on_after_paint)
+                results[name] = {'rows_ms': rows_ms, 'first_frame_ms': (time.perf_counter() - start) * 1000}
+                GLib.idle_add(next_scenario)
+            
+            window.refresh_task_list()
+            window.get_frame_clock().connect("after-paint", on_after_paint)
+            window.queue_draw()
+            return False
+        
+        window.connect("map", lambda widget: GLib.idle_add(next_scenario))
+        window.present()
+    
+    app = Gtk.Application(application_id="com.example.tasktracker.bench", flags=Gio.ApplicationFlags.NON_UNIQUE)
+    app.connect("activate", on_activate)
+    app.run([])
+    return results
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run the Task Tracker benchmark suite")
+    arg_parser.add_argument('--output', default='bench-results.json', help="JSON results file (default: bench-results.json)")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="repeats per measurement (default: 5)")
+    arg_parser.add_argument('--quick', action='store_true', help="only run the small scenarios")
+    arg_parser.add_argument('--no-rows', action='store_true', help="skip the GTK row benchmarks")
+    arg_parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                            help="run only this scenario (may be repeated)")
+    args = arg_parser.parse_args()
+    
+    names = args.scenario or (QUICK_SCENARIOS if args.quick else list(SCENARIOS))
+    results = {}
+    xvfb = None
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Keep the window from picking up the user's settings or last file
+        os.environ['HOME'] = temp_dir
+        os.environ['XDG_CONFIG_HOME'] = f"{temp_dir}/.config"
+        os.environ['XDG_CACHE_HOME'] = f"{temp_dir}/.cache"
+        os.chdir(temp_dir)
+        
+        file_paths = {}
+        for name in names:
+            num_tasks, density, depth = SCENARIOS[name]
+            file_path = Path(temp_dir) / f"{name}.md"
+            write_markdown(file_path, num_tasks, density, depth)
+            file_paths[name] = file_path
+            
+            results[name] = {'density': density, 'depth': depth, 'bytes': file_path.stat().st_size}
+            results[name].update(bench_parser(file_path, args.repeat))
+            print(f"{name}: " + ", ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                                          for key, value in results[name].items()))
+        
+        if not args.no_rows:
+            try:
+                if not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+                    from startup_benchmark import start_xvfb
+                    xvfb, os.environ['DISPLAY'] = start_xvfb()
+                for name, rows in bench_rows(file_paths, args.repeat).items():
+                    results[name].update(rows)
+                    print(f"{name}: rows_ms={rows['rows_ms']:.2f}, first_frame_ms={rows['first_frame_ms']:.2f}")
+            except RuntimeError as e:
+                print(f"Skipping row benchmarks: {e}")
+            finally:
+                if xvfb:
+                    xvfb.terminate()
+                    xvfb.wait()
+    
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Single-instance check: a repeat launch hands its file to the running app.
+
+Runs on a private session bus (re-executing itself under
+dbus-run-session) so an instance the caller already has open is not
+involved. Starts the app in a fresh HOME, waits until it has loaded
+tasks.md, then launches it again with another file and times how long
+that second process takes to exit. The fastest of a few bare
+interpreter starts is subtracted, and what remains, the forwarding
+itself, is checked against --max-forward-ms. A packaged executable has
+no such baseline, so for it the time is only reported. The running
+instance must open the forwarded file, which shows up as last_file in
+its settings. Without a DISPLAY a private Xvfb server is started.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from startup_benchmark import PROJECT_ROOT, start_xvfb, write_tasks
+
+PRIVATE_BUS_ENV = 'TASK_TRACKER_PRIVATE_BUS'
+
+def wait_for_last_file(settings_file, path, timeout):
+    """Seconds until the settings name path as the last file, or None on timeout"""
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        try:
+            if json.loads(settings_file.read_text()).get('last_file') == str(path):
+                return time.monotonic() - start
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.02)
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that repeat launches reuse the running instance")
+    parser.add_argument('--executable', help="packaged executable to launch (default: run src/main.py)")
+    parser.add_argument('--timeout', type=float, default=20, help="seconds to wait for each step")
+    parser.add_argument('--max-forward-ms', type=float, default=50,
+                        help="fail if forwarding takes longer than this on top of interpreter start (default: 50)")
+    args = parser.parse_args()
+    
+    if not os.environ.get(PRIVATE_BUS_ENV):
+        if not shutil.which('dbus-run-session'):
+            print("dbus-run-session is not installed")
+            return 2
+        env = dict(os.environ, **{PRIVATE_BUS_ENV: '1'})
+        return subprocess.call(['dbus-run-session', '--', sys.executable, __file__] + sys.argv[1:], env=env)
+    
+    if args.executable:
+        command = [str(Path(args.executable).resolve())]
+    else:
+        command = [sys.executable, str(PROJECT_ROOT / 'src' / 'main.py')]
+    
+    env = dict(os.environ)
+    xvfb = None
+    if not env.get('DISPLAY') and not env.get('WAYLAND_DISPLAY'):
+        xvfb, env['DISPLAY'] = start_xvfb()
+    env['GDK_BACKEND'] = env.get('GDK_BACKEND', 'x11')
+    
+    primary = None
+    forward_time = opened_time = None
+    # What the launch costs before the app does anything, to tell apart
+    # from the forwarding itself
+    baseline_time = None
+    if not args.executable:
+        runs = []
+        for _ in range(5):
+            start = time.monotonic()
+            subprocess.run([sys.executable, '-c', 'pass'], check=True)
+            runs.append(time.monotonic() - start)
+        baseline_time = min(runs)
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            run_env = dict(env, HOME=home, XDG_CONFIG_HOME=f"{home}/.config", XDG_CACHE_HOME=f"{home}/.cache")
+            settings_file = Path(home) / '.config' / 'task-tracker' / 'settings.json'
+            write_tasks(home, 10)
+            other_file = Path(home) / 'other.md'
+            other_file.write_text("- [ ] Forwarded task\n")
+            
+            primary = subprocess.Popen(command, cwd=home, env=run_env,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if wait_for_last_file(settings_file, Path(home) / 'tasks.md', args.timeout) is None:
+                print("❌ First instance did not load tasks.md")
+                return 1
+            
+            # Relative on purpose: it must resolve against this launch's directory
+            start = time.monotonic()
+            second = subprocess.run(command + ['other.md'], cwd=home, env=run_env, capture_output=True,
+                                    text=True, timeout=args.timeout)
+            forward_time = time.monotonic() - start
+            if second.returncode != 0:
+                print(f"❌ Repeat launch exited with code {second.returncode}:\n{second.stderr}")
+                return 1
+            if primary.poll() is not None:
+                print("❌ First instance exited")
+                return 1
+            opened_time = wait_for_last_file(settings_file, other_file, args.timeout)
+    finally:
+        if primary:
+            primary.terminate()
+            primary.wait()
+        if xvfb:
+            xvfb.terminate()
+            xvfb.wait()
+    
+    if opened_time is None:
+        print("❌ Running instance did not open the forwarded file")
+        return 1
+    print(f"repeat launch returned in {forward_time * 1000:.0f} ms")
+    print(f"running instance showed the file {opened_time * 1000:.0f} ms after that")
+    if baseline_time is None:
+        print("no interpreter baseline for a packaged executable; forwarding time not checked")
+    else:
+        forwarding_ms = (forward_time - baseline_time) * 1000
+        print(f"  interpreter start: {baseline_time * 1000:.0f} ms, forwarding: {forwarding_ms:.0f} ms")
+        if forwarding_ms > args.max_forward_ms:
+            print(f"❌ Forwarding slower than {args.max_forward_ms:.0f} ms")
+            return 1
+    print("✅ File was opened by the running instance")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: time to first window and first frame.
+
+Launches the app repeatedly with TASK_TRACKER_STARTUP_PROBE set, which
+makes it print monotonic timestamps when its window is mapped and first
+painted and then quit. Each run gets a fresh HOME and a synthetic
+tasks.md in its working directory so results don't depend on the
+caller's settings. Without a DISPLAY a private Xvfb server is started.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+def start_xvfb():
+    """Start Xvfb on a free display and return (process, display)"""
+    if not shutil.which('Xvfb'):
+        raise RuntimeError("No DISPLAY set and Xvfb is not installed")
+    
+    for number in range(99, 199):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}") or os.path.exists(f"/tmp/.X{number}-lock"):
+            continue
+        process = subprocess.Popen(['Xvfb', f':{number}', '-screen', '0', '1280x1024x24', '-nolisten', 'tcp'],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(100):
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                return process, f':{number}'
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+        process.kill()
+    raise RuntimeError("Could not start Xvfb")
+
+def write_tasks(directory, num_tasks):
+    with open(Path(directory) / 'tasks.md', 'w', encoding='utf-8') as f:
+        f.write("# Startup benchmark\n\n")
+        for i in range(num_tasks):
+            f.write(f"- [{'x' if i % 3 == 0 else ' '}] Benchmark task {i}\n")
+
+def run_once(command, env, num_tasks, timeout):
+    """Launch the app once and return (map seconds, first frame seconds)"""
+    with tempfile.TemporaryDirectory() as home:
+        run_env = dict(env, HOME=home, XDG_CONFIG_HOME=f"{home}/.config", XDG_CACHE_HOME=f"{home}/.cache",
+                       TASK_TRACKER_STARTUP_PROBE='1')
+        write_tasks(home, num_tasks)
+        
+        start = time.monotonic()
+        result = subprocess.run(command, cwd=home, env=run_env, capture_output=True, text=True, timeout=timeout)
+    
+    marks = {}
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[0] == 'startup-probe':
+            marks[parts[1]] = float(parts[2]) - start
+    
+    if 'map' not in marks or 'frame' not in marks:
+        raise RuntimeError(f"App exited without reporting startup (code {result.returncode}):\n{result.stderr}")
+    return marks['map'], marks['frame']
+
+def summarize(values):
+    return {
+        'median_ms': statistics.median(values) * 1000,
+        'min_ms': min(values) * 1000,
+        'max_ms': max(values) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Task Tracker startup time")
+    parser.add_argument('--executable', help="packaged executable to launch (default: run src/main.py)")
+    parser.add_argument('--runs', type=int, default=5, help="number of launches (default: 5)")
+    parser.add_argument('--tasks', type=int, default=50, help="tasks in the synthetic tasks.md (default: 50)")
+    parser.add_argument('--timeout', type=float, default=60, help="seconds before a launch is abandoned")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--max-first-frame-ms', type=float,
+                        help="exit with status 1 if the median time to first frame exceeds this")
+    args = parser.parse_args()
+    
+    if args.executable:
+        command = [str(Path(args.executable).resolve())]
+    else:
+        command = [sys.executable, str(PROJECT_ROOT / 'src' / 'main.py')]
+    
+    env = dict(os.environ)
+    xvfb = None
+    if not env.get('DISPLAY') and not env.get('WAYLAND_DISPLAY'):
+        xvfb, env['DISPLAY'] = start_xvfb()
+    env['GDK_BACKEND'] = env.get('GDK_BACKEND', 'x11')
+    
+    try:
+        map_times, frame_times = [], []
+        for run in range(args.runs):
+            map_time, frame_time = run_once(command, env, args.tasks, args.timeout)
+            map_times.append(map_time)
+            frame_times.append(frame_time)
+            print(f"run {run + 1}: window mapped {map_time * 1000:.0f} ms, first frame {frame_time * 1000:.0f} ms")
+    finally:
+        if xvfb:
+            xvfb.terminate()
+            xvfb.wait()
+    
+    results = {
+        'command': command,
+        'runs': args.runs,
+        'tasks': args.tasks,
+        'first_window': summarize(map_times),
+        'first_frame': summarize(frame_times),
+    }
+    print(f"median: window mapped {results['first_window']['median_ms']:.0f} ms, "
+          f"first frame {results['first_frame']['median_ms']:.0f} ms")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    if args.max_first_frame_ms is not None and results['first_frame']['median_ms'] > args.max_first_frame_ms:
+        print(f"❌ Startup regression: first frame above {args.max_first_frame_ms:.0f} ms")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@
 Build script for creating standalone Task Tracker executable
 """
 
+import argparse
 import subprocess
 import sys
 import os
@@ -27,7 +28,19 @@ def setup_venv(venv_path):
     
     return python_exe, pip_exe
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the Task Tracker standalone executable")
+    parser.add_argument("--onedir", action="store_true",
+                        help="Build an unpacked directory instead of a single file; "
+                             "starts faster because nothing is extracted at launch")
+    parser.add_argument("--no-upx", action="store_true",
+                        help="Skip UPX compression so binaries don't need unpacking at launch")
+    parser.add_argument("--optimize", type=int, choices=[0, 1, 2],
+                        help="Bytecode optimization level for bundled modules (PyInstaller 6+)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     print("Building Task Tracker standalone executable...")
     
     # Ensure we're in the right directory
@@ -124,10 +137,16 @@ def main():
     # Build command (simple approach - let PyInstaller auto-detect dependencies)
     build_cmd = [
         str(pyinstaller_exe),
-        "--onefile",                    # Single executable file
+        "--onedir" if args.onedir else "--onefile",  # Unpacked directory or single executable file
         "--name=task-tracker",          # Executable name
-        "src/main.py"
     ]
+    if args.no_upx:
+        build_cmd.append("--noupx")
+    if args.optimize is not None:
+        build_cmd.append(f"--optimize={args.optimize}")
+    build_cmd.append("src/main.py")
+    
+    executable = "dist/task-tracker/task-tracker" if args.onedir else "dist/task-tracker"
     
     try:
         print("Running PyInstaller...")
@@ -135,9 +154,9 @@ def main():
         subprocess.check_call(build_cmd)
         
         print("\n✅ Build completed successfully!")
-        print(f"Executable created: {project_root}/dist/task-tracker")
+        print(f"Executable created: {project_root}/{executable}")
         print("\nTo test the executable:")
-        print("  ./dist/task-tracker")
+        print(f"  ./{executable}")
         
     except subprocess.CalledProcessError as e:
         print(f"❌ Build failed: {e}")
@@ -29,4 +29,16 @@ print('✅ GTK4 imported successfully')
 echo "🚀 Starting build process..."
 python3 build.py
 
+# Catch startup regressions in the packaged executable
+if [ -n "$DISPLAY" ] || command -v Xvfb >/dev/null 2>&1; then
+    echo "⏱️  Running startup benchmark..."
+    python3 benchmarks/startup_benchmark.py \
+        --executable dist/task-tracker \
+        --runs 5 \
+        --output startup-benchmark.json \
+        --max-first-frame-ms "${STARTUP_BUDGET_MS:-3000}"
+else
+    echo "⚠️  Xvfb not installed, skipping startup benchmark"
+fi
+
 echo "✅ CI build completed successfully!"
\ No newline at end of file
@@ -49,7 +49,7 @@ A lightweight Linux desktop application for managing markdown task lists with in
 ## System Requirements
 
 - Linux x86_64 with GTK4 libraries (usually pre-installed)
-- Optional: wmctrl for always-on-top functionality (\`sudo apt install wmctrl\`)
+- X11 session for always-on-top functionality
 
 ## Features
 
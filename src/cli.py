@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Command-line interface for scripts and cron jobs.
+
+Works on the same markdown files as the window but never imports gi, so
+it starts in milliseconds and needs no display. Every invocation reads
+the file once and writes it at most once, however many operations it
+carries.
+
+    cli.py list [--open | --done] [--json]
+    cli.py stats [--json]
+    cli.py agenda [-n COUNT] [--json]
+    cli.py toggle INDEX... [--done | --open] [--json]
+    cli.py add TEXT... [--done] [--json]
+    cli.py batch [OPERATIONS]
+
+Tasks are addressed by their 0-based index as shown by ``list``. The
+file defaults to the one last opened in the window, then ./tasks.md.
+
+``batch`` reads a JSON array, or one JSON object per line, from a file
+or stdin and applies the operations in order::
+
+    {"op": "toggle", "index": 3}
+    {"op": "toggle", "index": 4, "completed": true}
+    {"op": "add", "text": "Water the plants", "completed": false}
+"""
+
+import argparse
+import json
+import sys
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from task_parser import Task, TaskParser
+from parse_cache import ParseCache
+from settings import Settings
+import instrumentation
+
+class UsageError(Exception):
+    """Invalid operation; reported without touching the file"""
+
+def default_file() -> Path:
+    last_file = Settings().get_last_file()
+    if last_file and Path(last_file).is_file():
+        return Path(last_file)
+    return Path.cwd() / 'tasks.md'
+
+def task_json(index: int, task: Task) -> dict:
+    return {
+        'index': index,
+        'line': task.line_number + 1,
+        'indent': task.indent,
+        'text': task.text,
+        'completed': task.completed,
+    }
+
+def percent(done: int, total: int) -> float:
+    return round(100 * done / total, 1) if total else 0.0
+
+def stats_json(parser: TaskParser) -> dict:
+    sections = parser.get_sections()
+    done, total = sections.done_total, sections.total
+    return {
+        'file': str(parser.file_path),
+        'total': total,
+        'done': done,
+        'open': total - done,
+        'percent': percent(done, total),
+        'sections': [{'title': title, 'level': level, 'line': line_number + 1, 'done': section_done,
+                      'total': section_total, 'percent': percent(section_done, section_total)}
+                     for title, level, line_number, section_done, section_total in sections.entries()],
+    }
+
+class Batch:
+    """Operations validated against one loaded file and saved with one write.
+    
+    Nothing touches the parser until ``save()``, so an invalid operation
+    anywhere in a batch leaves the file alone. Runs of toggles and of adds
+    are then applied with one parser call each, in their original order.
+    """
+    
+    def __init__(self, parser: TaskParser):
+        self.parser = parser
+        self.count = len(parser.get_tasks())
+        # Latest state of every task touched so far, including added ones
+        self.states: Dict[int, bool] = {}
+        self.operations: List[Tuple[str, object, bool]] = []
+        self.changed: List[int] = []
+    
+    def toggle(self, index: int, completed: Optional[bool] = None):
+        if type(index) is not int or not (0 <= index < self.count):
+            raise UsageError(f"No task with index {index}")
+        if completed is None:
+            current = self.states[index] if index in self.states else self.parser.get_tasks()[index].completed
+            completed = not current
+        self.states[index] = bool(completed)
+        self.operations.append(('toggle', index, bool(completed)))
+        self.changed.append(index)
+    
+    def add(self, text: str, completed: bool = False):
+        # An added line always parses as exactly one task at the end
+        text = ' '.join(str(text).split())
+        if not text:
+            raise UsageError("Task text is empty")
+        self.states[self.count] = bool(completed)
+        self.operations.append(('add', text, bool(completed)))
+        self.changed.append(self.count)
+        self.count += 1
+    
+    def save(self) -> bool:
+        runs = groupby(self.operations, key=lambda operation: (operation[0], operation[0] == 'add' and operation[2]))
+        for (kind, completed), run in runs:
+            if kind == 'add':
+                self.parser.add_tasks([text for _, text, _ in run], completed)
+            else:
+                self.parser.update_task_statuses([(index, state) for _, index, state in run])
+        return self.parser.flush()
+    
+    def changed_json(self) -> List[dict]:
+        tasks = self.parser.get_tasks()
+        return [task_json(index, tasks[index]) for index in dict.fromkeys(self.changed)]
+
+def read_operations(source: str) -> List[dict]:
+    text = sys.stdin.read() if source == '-' else Path(source).read_text(encoding='utf-8')
+    text = text.strip()
+    if text.startswith('['):
+        operations = json.loads(text)
+    else:
+        operations = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if not all(isinstance(operation, dict) for operation in operations):
+        raise UsageError("Operations must be JSON objects")
+    return operations
+
+def run_operations(batch: Batch, operations: List[dict]):
+    for operation in operations:
+        kind = operation.get('op')
+        if kind == 'toggle':
+            batch.toggle(operation.get('index'), operation.get('completed'))
+        elif kind == 'add':
+            batch.add(operation.get('text', ''), operation.get('completed', False))
+        else:
+            raise UsageError(f"Unknown operation: {kind!r}")
+
+def agenda_json(parser: TaskParser, limit: int) -> List[dict]:
+    tasks = parser.get_tasks()
+    agenda = parser.get_agenda()
+    entries = []
+    for index in agenda.top(limit):
+        metadata = agenda.metadata(index)
+        entry = task_json(index, tasks[index])
+        entry.update(due=metadata.due.isoformat() if metadata.due else None,
+                     priority=metadata.priority, owners=list(metadata.owners))
+        entries.append(entry)
+    return entries
+
+def print_tasks(entries: List[dict]):
+    width = len(str(max(entry['index'] for entry in entries))) if entries else 1
+    for entry in entries:
+        status = 'x' if entry['completed'] else ' '
+        print(f"{entry['index']:>{width}} [{status}] {entry['indent']}{entry['text']}")
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    arg_parser = argparse.ArgumentParser(description="List, count, toggle and add markdown tasks without the GUI")
+    arg_parser.add_argument('-f', '--file', type=Path, help="markdown file (default: last opened file, then ./tasks.md)")
+    arg_parser.add_argument('--trace', metavar='FILE', help="record a Chrome trace to FILE and print timings to stderr")
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    
+    list_command = commands.add_parser('list', help="print tasks")
+    state = list_command.add_mutually_exclusive_group()
+    state.add_argument('--open', action='store_true', help="only open tasks")
+    state.add_argument('--done', action='store_true', help="only completed tasks")
+    list_command.add_argument('--json', action='store_true', help="print JSON")
+    
+    stats_command = commands.add_parser('stats', help="count open and completed tasks, overall and per heading")
+    stats_command.add_argument('--json', action='store_true', help="print JSON")
+    
+    agenda_command = commands.add_parser('agenda', help="print the next open tasks by due date, then priority")
+    agenda_command.add_argument('-n', '--count', type=int, default=10, help="number of tasks (default: 10)")
+    agenda_command.add_argument('--json', action='store_true', help="print JSON with due, priority and owners")
+    
+    toggle_command = commands.add_parser('toggle', help="flip or set the state of tasks")
+    toggle_command.add_argument('indexes', type=int, nargs='+', metavar='INDEX')
+    state = toggle_command.add_mutually_exclusive_group()
+    state.add_argument('--done', action='store_const', const=True, dest='completed', help="mark as completed")
+    state.add_argument('--open', action='store_const', const=False, dest='completed', help="mark as open")
+    toggle_command.add_argument('--json', action='store_true', help="print changed tasks as JSON")
+    
+    add_command = commands.add_parser('add', help="append tasks to the end of the file")
+    add_command.add_argument('texts', nargs='+', metavar='TEXT')
+    add_command.add_argument('--done', action='store_true', help="add as completed")
+    add_command.add_argument('--json', action='store_true', help="print added tasks as JSON")
+    
+    batch_command = commands.add_parser('batch', help="apply JSON operations from a file or stdin")
+    batch_command.add_argument('operations', nargs='?', default='-', help="operations file (default: stdin)")
+    return arg_parser
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    if args.trace:
+        instrumentation.enable(args.trace)
+    
+    file_path = args.file or default_file()
+    parser = TaskParser(parse_cache=ParseCache())
+    if not parser.load_file(str(file_path)):
+        return 1
+    
+    if args.command == 'list':
+        tasks = parser.get_tasks()
+        entries = [task_json(index, task) for index, task in enumerate(tasks)
+                   if not (args.open and task.completed or args.done and not task.completed)]
+        if args.json:
+            print(json.dumps(entries, ensure_ascii=False, indent=2))
+        else:
+            print_tasks(entries)
+        return 0
+    
+    if args.command == 'stats':
+        stats = stats_json(parser)
+        if args.json:
+            print(json.dumps(stats, ensure_ascii=False, indent=2))
+        else:
+            print(f"{stats['done']}/{stats['total']} done ({stats['percent']}%), {stats['open']} open")
+            for section in stats['sections']:
+                indent = '  ' * max(section['level'] - 1, 0)
+                print(f"  {indent}{section['title'] or '(before first heading)'}: "
+                      f"{section['done']}/{section['total']} ({section['percent']}%)")
+        return 0
+    
+    if args.command == 'agenda':
+        entries = agenda_json(parser, args.count)
+        if args.json:
+            print(json.dumps(entries, ensure_ascii=False, indent=2))
+        else:
+            print_tasks(entries)
+        return 0
+    
+    batch = Batch(parser)
+    try:
+        if args.command == 'toggle':
+            for index in args.indexes:
+                batch.toggle(index, args.completed)
+        elif args.command == 'add':
+            for text in args.texts:
+                batch.add(text, args.done)
+        else:
+            run_operations(batch, read_operations(args.operations))
+    except (UsageError, ValueError, OSError) as e:
+        # Nothing has been written yet
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    
+    if not batch.save():
+        return 1
+    
+    if args.command == 'batch':
+        print(json.dumps({'changed': batch.changed_json(), 'stats': stats_json(parser)}, ensure_ascii=False, indent=2))
+    elif args.json:
+        print(json.dumps(batch.changed_json(), ensure_ascii=False, indent=2))
+    else:
+        print_tasks(batch.changed_json())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+from collections import Counter
+from typing import Callable, Dict, Hashable, Tuple
+
+Size = Tuple[int, int]
+
+class ContentSize:
+    """Natural size of the task list, tracked incrementally.
+    
+    ``measure(text, is_header)`` returns the pixel width and height of one
+    row. Results are cached by text, so reloading a file or re-adding a
+    task only measures text it has not seen with the current font. The
+    widest row is found from a histogram of widths and the total height
+    is a running sum, so each add, update or remove costs O(1) apart from
+    the occasional rescan of distinct widths when the widest row goes.
+    """
+    # Drop cached measurements on clear() once they outgrow this many texts
+    CACHE_LIMIT = 200_000
+    
+    def __init__(self, measure: Callable[[str, bool], Size]):
+        self.measure = measure
+        self.total_height = 0
+        self._cache: Dict[Tuple[str, bool], Size] = {}
+        self._rows: Dict[Hashable, Tuple[str, bool, Size]] = {}
+        self._widths = Counter()
+        self._max_width = 0
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    @property
+    def max_width(self) -> int:
+        if self._max_width not in self._widths:
+            self._max_width = max(self._widths, default=0)
+        return self._max_width
+    
+    def _size(self, text: str, is_header: bool) -> Size:
+        key = (text, is_header)
+        size = self._cache.get(key)
+        if size is None:
+            size = self._cache[key] = self.measure(text, is_header)
+        return size
+    
+    def add(self, row: Hashable, text: str, is_header: bool = False):
+        size = self._size(text, is_header)
+        self._rows[row] = (text, is_header, size)
+        width, height = size
+        self._widths[width] += 1
+        self._max_width = max(self._max_width, width)
+        self.total_height += height
+    
+    def remove(self, row: Hashable):
+        entry = self._rows.pop(row, None)
+        if entry is None:
+            return
+        width, height = entry[2]
+        self._widths[width] -= 1
+        if not self._widths[width]:
+            # max_width rescans lazily if this was the widest row
+            del self._widths[width]
+        self.total_height -= height
+    
+    def update(self, row: Hashable, text: str, is_header: bool = False):
+        entry = self._rows.get(row)
+        if entry is None or entry[:2] != (text, is_header):
+            self.remove(row)
+            self.add(row, text, is_header)
+    
+    def clear(self):
+        self._rows.clear()
+        self._widths.clear()
+        self._max_width = 0
+        self.total_height = 0
+        if len(self._cache) > self.CACHE_LIMIT:
+            self._cache.clear()
+    
+    def remeasure(self):
+        """Measure every row again, e.g. after the font changed"""
+        rows = [(row, text, is_header) for row, (text, is_header, _) in self._rows.items()]
+        self._cache.clear()
+        self.clear()
+        for row, text, is_header in rows:
+            self.add(row, text, is_header)
@@ -0,0 +1,115 @@
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Set
+
+class DirectoryWatcher:
+    """Watch a directory and report debounced sets of changed files.
+    
+    Bursts of events are collected and reported together through one
+    callback fired ``debounce`` seconds after the last event. The callback
+    runs on a watcher thread; GUI callers must hop back to their main loop
+    themselves.
+    
+    watchdog is imported on the first ``watch()`` call to keep it off the
+    startup path; the watcher is passed to it as a plain event handler.
+    """
+    
+    # Event types that mean file content may have changed. Plain opens and
+    # read-only closes are ignored so our own reads don't loop.
+    CHANGE_EVENTS = {'modified', 'created', 'moved', 'closed', 'deleted'}
+    
+    def __init__(self, callback: Callable[[Set[str]], None], debounce: float = 0.2, recursive: bool = True):
+        self.callback = callback
+        self.debounce = debounce
+        self.recursive = recursive
+        self._observer = None
+        self._timer: Optional[threading.Timer] = None
+        self._changed: Set[str] = set()
+        self._lock = threading.Lock()
+    
+    def watch(self, directory: str):
+        """Start watching directory, replacing anything watched before"""
+        self.stop()
+        
+        try:
+            from watchdog.observers import Observer
+            
+            observer = Observer()
+            observer.schedule(self, str(directory), recursive=self.recursive)
+            observer.daemon = True
+            observer.start()
+            self._observer = observer
+        except OSError as e:
+            print(f"Could not watch {directory}: {e}")
+    
+    def stop(self):
+        """Stop watching and drop any pending notification"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            self._changed.clear()
+        
+        if self._observer:
+            self._observer.stop()
+            self._observer = None
+    
+    def wants(self, path: str) -> bool:
+        """Whether changes to path should be reported"""
+        return True
+    
+    def dispatch(self, event):
+        """Entry point called by the watchdog observer for every event"""
+        if event.is_directory or event.event_type not in self.CHANGE_EVENTS:
+            return
+        
+        paths = {os.path.abspath(path) for path in (event.src_path, getattr(event, 'dest_path', None))
+                 if path and self.wants(path)}
+        if not paths:
+            return
+        
+        with self._lock:
+            self._changed |= paths
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _fire(self):
+        with self._lock:
+            self._timer = None
+            changed, self._changed = self._changed, set()
+        
+        if changed:
+            self.notify(changed)
+    
+    def notify(self, paths: Set[str]):
+        self.callback(paths)
+
+class FileWatcher(DirectoryWatcher):
+    """Watch a single file and report debounced change notifications.
+    
+    The parent directory is watched instead of the file itself so that
+    editors which save by writing a temporary file and renaming it over
+    the original are still noticed.
+    """
+    
+    CHANGE_EVENTS = {'modified', 'created', 'moved', 'closed'}
+    
+    def __init__(self, callback: Callable[[], None], debounce: float = 0.2):
+        super().__init__(callback, debounce, recursive=False)
+        self.file_path: Optional[str] = None
+    
+    def watch(self, file_path: str):
+        """Start watching file_path, replacing any previously watched file"""
+        self.file_path = os.path.abspath(file_path)
+        super().watch(str(Path(self.file_path).parent))
+    
+    def wants(self, path: str) -> bool:
+        return os.path.abspath(path) == self.file_path
+    
+    def notify(self, paths: Set[str]):
+        if self.file_path and os.path.exists(self.file_path):
+            self.callback()
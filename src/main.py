@@ -1,25 +1,98 @@
 #!/usr/bin/env python3
 
+import sys
+from remote_launch import APPLICATION_ID, forward_to_running_instance
+
+if __name__ == "__main__":
+    # A repeat launch hands its files to the running instance and exits
+    # before GTK and the app modules are loaded
+    status = forward_to_running_instance(sys.argv)
+    if status is not None:
+        sys.exit(status)
+
 import gi
 gi.require_version('Gtk', '4.0')
-gi.require_version('GdkX11', '4.0')
 gi.require_version('Gio', '2.0')
-gi.require_version('Gdk', '4.0')
-from gi.repository import Gtk, GLib, GdkX11, Gio, Gdk
-import sys
-import subprocess
+gi.require_version('Pango', '1.0')
+from gi.repository import Gtk, GLib, Gio, GObject, Pango
+import os
+import threading
+import time
+import heapq
+from collections import Counter
 from pathlib import Path
-from task_parser import TaskParser, Task
+from typing import Optional
+from task_parser import DiskSnapshot, TaskParser, Task, TaskDiff
 from settings import Settings
+from file_watcher import FileWatcher, DirectoryWatcher
+from task_model import TaskItem
+from parse_cache import ParseCache
+from workspace import Workspace
+from search_index import SearchIndex
+from content_size import ContentSize
+from recent_files import RecentFiles
+import instrumentation
+from instrumentation import count, traced
 
 class TaskTrackerWindow(Gtk.ApplicationWindow):
-    def __init__(self, app):
+    SEARCH_STATES = [None, SearchIndex.OPEN, SearchIndex.DONE]
+    # Sort dropdown positions; None keeps file order
+    SORT_PROPERTIES = [None, "text", "depth"]
+    # Vertical gap between rows allowed for by auto-resize
+    ROW_SPACING = 5
+    # Rows added per idle callback while a file streams in
+    LOAD_CHUNK = 500
+    # Tasks listed in agenda mode
+    AGENDA_SIZE = 50
+    
+    def __init__(self, app, initial_path: Optional[str] = None):
         super().__init__(application=app, title="Task Tracker")
         
-        self.parser = TaskParser()
-        self.task_checkboxes = []
+        self.parse_cache = ParseCache()
+        self.parser = TaskParser(parse_cache=self.parse_cache)
         self.settings = Settings()
         
+        # X display connection for window manager requests, opened on first use
+        self.x11 = None
+        self.connect("realize", self.on_realize)
+        # GTK drops a destroyed window from the application before its
+        # shutdown runs, so queued writes are flushed when it closes
+        self.connect("close-request", self.on_close_request)
+        self.shut_down = False
+        
+        # In workspace mode every markdown file in a folder is shown,
+        # grouped by file; otherwise only self.parser's file
+        self.workspace = None
+        
+        # Token of the file load in progress, if any; see load_file()
+        self.pending_load = None
+        # Parsers and rows of files switched away from, for switching back
+        self.recent_files = RecentFiles()
+        open_recent = Gio.SimpleAction.new("open-recent", GLib.VariantType.new("s"))
+        open_recent.connect("activate", lambda action, path: self.open_path(path.get_string()))
+        self.add_action(open_recent)
+        
+        # Watch the open file or workspace for external edits; notifications
+        # arrive on a watcher thread and are forwarded to the main loop
+        self.file_watcher = FileWatcher(lambda: GLib.idle_add(self.on_file_changed))
+        self.workspace_watcher = DirectoryWatcher(lambda paths: GLib.idle_add(self.on_workspace_changed, paths))
+        
+        # Filter-as-you-type: every task item in the model is indexed as it
+        # is added, so a keystroke only costs an index lookup. search_matches
+        # is None while nothing is filtered; match_counts tracks matches per
+        # file so workspace headers hide along with their tasks.
+        self.search_index = SearchIndex()
+        self.search_query = ""
+        self.search_state = None
+        self.search_matches = None
+        self.match_counts = Counter()
+        
+        # Natural size of every row, measured with Pango as items are added
+        # and kept up to date so auto-resize never scans the list
+        self.content_size = ContentSize(self.measure_row)
+        self.measure_layout = None
+        Gtk.Settings.get_default().connect("notify::gtk-font-name", self.on_font_changed)
+        
         # Set up window with saved geometry
         geometry = self.settings.get_window_geometry()
         self.set_default_size(geometry['width'], geometry['height'])
@@ -34,24 +107,75 @@ class TaskTrackerWindow(Gtk.ApplicationWindow):
         self.set_child(main_box)
         
         # Create toolbar
-        toolbar = self.create_toolbar()
-        main_box.append(toolbar)
+        self.toolbar = self.create_toolbar()
+        main_box.append(self.toolbar)
+        self.search_bar = self.create_search_bar()
+        main_box.append(self.search_bar)
+        
+        # Shown while a file loads or a workspace is being indexed
+        self.progress_bar = Gtk.ProgressBar()
+        self.progress_bar.set_show_text(True)
+        self.progress_bar.set_visible(False)
+        main_box.append(self.progress_bar)
         
         # Create scrolled window for tasks
         scrolled = Gtk.ScrolledWindow()
         scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         scrolled.set_vexpand(True)
         
-        # Create task list container
-        self.task_list = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
+        # Create task list view; rows are only built for visible items and
+        # recycled while scrolling
+        self.task_store = Gio.ListStore.new(TaskItem)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self.on_task_row_setup)
+        factory.connect("bind", self.on_task_row_bind)
+        factory.connect("unbind", self.on_task_row_unbind)
+        
+        # Filtering runs in chunks between frames so large lists stay responsive
+        self.task_filter = Gtk.CustomFilter.new(self.filter_item)
+        self.filtered_tasks = Gtk.FilterListModel.new(self.task_store, self.task_filter)
+        self.filtered_tasks.set_incremental(True)
+        # Rows can be selected with ctrl/shift-click for the bulk actions
+        self.search_view = Gtk.MultiSelection.new(self.filtered_tasks)
+        
+        # Without a search the list is a tree: top-level tasks and workspace
+        # headers at the root, nested tasks only created once their parent
+        # is expanded. Child models are kept per item so they can be updated
+        # in place when the file changes.
+        self.child_stores = {}
+        self.root_filter = Gtk.CustomFilter.new(lambda item: item.is_header or item.is_root)
+        self.root_tasks = Gtk.FilterListModel.new(self.task_store, self.root_filter)
+        self.task_tree = Gtk.TreeListModel.new(self.root_tasks, False, False, self.create_child_model)
+        self.tree_view = Gtk.MultiSelection.new(self.task_tree)
+        
+        # Sorted modes are a flat view over the (searched) tasks without
+        # headers. GTK compares precomputed keys: collation keys of the text
+        # and plain numbers for state and depth. The sort is stable, so ties
+        # stay in file order, and a row whose key changes is moved on its
+        # own. The file itself is never reordered.
+        self.sortable_tasks = Gtk.FilterListModel.new(None, Gtk.CustomFilter.new(lambda item: not item.is_header))
+        self.sorted_tasks = Gtk.SortListModel.new(self.sortable_tasks, None)
+        self.sorted_tasks.set_incremental(True)
+        self.sorted_view = Gtk.MultiSelection.new(self.sorted_tasks)
+        # TaskItem properties the current sort order depends on
+        self.sort_properties = set()
+        
+        # Agenda mode lists the next open tasks by due date and priority;
+        # the store holds the same items as task_store
+        self.agenda_store = Gio.ListStore.new(TaskItem)
+        self.agenda_view = Gtk.MultiSelection.new(self.agenda_store)
+        self.agenda_refresh_queued = False
+        
+        self.task_list = Gtk.ListView.new(self.tree_view, factory)
         scrolled.set_child(self.task_list)
         
         main_box.append(scrolled)
         
-        # Load last opened file or default file
-        last_file = self.settings.get_last_file()
+        # Load the requested path, else the last opened file or workspace,
+        # else the default file
+        last_file = initial_path or self.settings.get_last_file()
         if last_file:
-            self.load_file(last_file)
+            self.open_path(last_file)
         else:
             # Fallback to default file if exists
             default_file = Path.cwd() / "tasks.md"
@@ -69,6 +193,22 @@ class TaskTrackerWindow(Gtk.ApplicationWindow):
         open_button.connect("clicked", self.on_open_file)
         toolbar.append(open_button)
         
+        # Open folder as workspace
+        workspace_button = Gtk.Button()
+        workspace_button.set_child(Gtk.Image.new_from_icon_name("folder-documents-symbolic"))
+        workspace_button.set_tooltip_text("Open Folder as Workspace")
+        workspace_button.connect("clicked", self.on_open_workspace)
+        toolbar.append(workspace_button)
+        
+        # Recently opened files and workspaces
+        self.recent_menu = Gio.Menu()
+        recent_button = Gtk.MenuButton()
+        recent_button.set_icon_name("document-open-recent-symbolic")
+        recent_button.set_tooltip_text("Recent Files")
+        recent_button.set_menu_model(self.recent_menu)
+        toolbar.append(recent_button)
+        self.update_recent_menu()
+        
         # Always on top toggle with pin icon
         self.always_on_top_button = Gtk.ToggleButton()
         self.pin_icon = Gtk.Image.new_from_icon_name("view-pin-symbolic")
@@ -78,6 +218,40 @@ class TaskTrackerWindow(Gtk.ApplicationWindow):
         self.always_on_top_button.connect("toggled", self.on_always_on_top_toggled)
         toolbar.append(self.always_on_top_button)
         
+        # Whether checking a task also checks its subtasks
+        cascade_button = Gtk.ToggleButton()
+        cascade_button.set_child(Gtk.Image.new_from_icon_name("view-list-bullet-symbolic"))
+        cascade_button.set_tooltip_text("Checking a Task Also Checks Its Subtasks")
+        cascade_button.set_active(self.settings.get_cascade_completion())
+        cascade_button.connect("toggled", lambda button: self.settings.set_cascade_completion(button.get_active()))
+        toolbar.append(cascade_button)
+        
+        # Agenda mode
+        self.agenda_button = Gtk.ToggleButton()
+        self.agenda_button.set_child(Gtk.Image.new_from_icon_name("x-office-calendar-symbolic"))
+        self.agenda_button.set_tooltip_text("Agenda: Next Tasks by Due Date and Priority")
+        self.agenda_button.connect("toggled", self.on_agenda_toggled)
+        toolbar.append(self.agenda_button)
+        
+        # Bulk actions, each saved with one write per file
+        bulk_menu = Gio.Menu()
+        for label, name, handler in [
+            ("Complete Selected", "complete-selected", lambda: self.set_items_completed(self.selected_items(), True)),
+            ("Uncheck Selected", "uncheck-selected", lambda: self.set_items_completed(self.selected_items(), False)),
+            ("Complete Section of Selected", "complete-section", self.complete_selected_sections),
+            ("Uncheck All", "uncheck-all", lambda: self.set_items_completed(self.task_items(), False)),
+            ("Remove Completed…", "remove-completed", self.confirm_remove_completed),
+        ]:
+            action = Gio.SimpleAction.new(name, None)
+            action.connect("activate", lambda action, parameter, handler=handler: self.run_bulk_action(handler))
+            self.add_action(action)
+            bulk_menu.append(label, f"win.{name}")
+        bulk_button = Gtk.MenuButton()
+        bulk_button.set_icon_name("checkbox-checked-symbolic")
+        bulk_button.set_tooltip_text("Bulk Actions")
+        bulk_button.set_menu_model(bulk_menu)
+        toolbar.append(bulk_button)
+        
         # File label
         self.file_label = Gtk.Label(label="No file loaded")
         self.file_label.set_ellipsize(3)  # ELLIPSIZE_END
@@ -85,8 +259,47 @@ class TaskTrackerWindow(Gtk.ApplicationWindow):
         self.file_label.set_xalign(1.0)
         toolbar.append(self.file_label)
         
+        # Completion of the file or workspace; the tooltip breaks it down
+        # by heading, or by file in a workspace
+        self.completion_bar = Gtk.ProgressBar()
+        self.completion_bar.set_valign(Gtk.Align.CENTER)
+        self.completion_bar.set_size_request(60, -1)
+        self.completion_bar.set_has_tooltip(True)
+        self.completion_bar.connect("query-tooltip", self.on_completion_tooltip)
+        toolbar.append(self.completion_bar)
+        self.completion_label = Gtk.Label()
+        self.completion_label.add_css_class("dim-label")
+        toolbar.append(self.completion_label)
+        self.update_completion()
+        
         return toolbar
     
+    def create_search_bar(self):
+        search_bar = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text("Filter tasks")
+        self.search_entry.set_hexpand(True)
+        self.search_entry.connect("changed", self.on_search_changed)
+        search_bar.append(self.search_entry)
+        
+        # Completion state filter; positions map to SEARCH_STATES
+        self.state_dropdown = Gtk.DropDown.new_from_strings(["All", "Open", "Done"])
+        self.state_dropdown.connect("notify::selected", self.on_search_changed)
+        search_bar.append(self.state_dropdown)
+        
+        # View order; positions map to SORT_PROPERTIES
+        self.sort_dropdown = Gtk.DropDown.new_from_strings(["File Order", "A–Z", "Depth"])
+        self.sort_dropdown.set_tooltip_text("Sort Tasks")
+        self.sort_dropdown.connect("notify::selected", self.on_sort_changed)
+        search_bar.append(self.sort_dropdown)
+        self.open_first_button = Gtk.ToggleButton(label="Open First")
+        self.open_first_button.set_tooltip_text("List Open Tasks Before Done Ones")
+        self.open_first_button.connect("toggled", self.on_sort_changed)
+        search_bar.append(self.open_first_button)
+        
+        return search_bar
+    
     def on_open_file(self, button):
         dialog = Gtk.FileDialog(title="Open Markdown File")
         
@@ -116,104 +329,966 @@ class TaskTrackerWindow(Gtk.ApplicationWindow):
         except GLib.Error as error:
             print(f"File dialog cancelled or error: {error.message}")
     
+    def on_open_workspace(self, button):
+        dialog = Gtk.FileDialog(title="Open Workspace Folder")
+        dialog.select_folder(self, None, self.on_workspace_dialog_response)
+    
+    def on_workspace_dialog_response(self, dialog, result):
+        try:
+            folder = dialog.select_folder_finish(result)
+            if folder:
+                self.open_workspace(folder.get_path())
+        except GLib.Error as error:
+            print(f"Folder dialog cancelled or error: {error.message}")
+    
     def on_always_on_top_toggled(self, button):
-        """Toggle always on top using wmctrl"""
-        # Save the setting
         self.settings.set_always_on_top(button.get_active())
+        self.apply_always_on_top()
+    
+    def on_close_request(self, window):
+        self.shutdown()
+        return False  # Let the window close
+    
+    def shutdown(self):
+        """Write everything still queued and release watchers; safe to call twice"""
+        if self.shut_down:
+            return
+        self.shut_down = True
+        self.file_watcher.stop()
+        self.parser.flush()
+        self.parser.store_index()
+        self.close_workspace()
+        self.settings.flush()
+        if self.x11:
+            self.x11.close()
+            self.x11 = None
+    
+    def on_realize(self, window):
+        # The saved always-on-top state can only be requested once the
+        # window manager has mapped the window
+        surface = self.get_surface()
+        self.mapped_handler = surface.connect("notify::mapped", self.on_surface_mapped)
+    
+    def on_surface_mapped(self, surface, pspec):
+        if surface.get_mapped():
+            surface.disconnect(self.mapped_handler)
+            if self.always_on_top_button.get_active():
+                self.apply_always_on_top()
+    
+    def apply_always_on_top(self):
+        """Ask the window manager to keep the window above others, or stop"""
+        surface = self.get_surface()
+        if not surface or not surface.get_mapped():
+            return  # Applied by on_surface_mapped once the window is shown
         
         try:
-            # Get window XID
-            surface = self.get_surface()
-            if not surface:
-                print("No surface available")
-                return
-                
-            if isinstance(surface, GdkX11.X11Surface):
-                xid = GdkX11.X11Surface.get_xid(surface)
-                xid_hex = hex(xid)
-                
-                if button.get_active():
-                    # Add always on top state
-                    subprocess.run([
-                        'wmctrl', '-i', '-r', xid_hex, '-b', 'add,above'
-                    ], check=True)
-                    print(f"Set window {xid_hex} always on top")
-                else:
-                    # Remove always on top state
-                    subprocess.run([
-                        'wmctrl', '-i', '-r', xid_hex, '-b', 'remove,above'
-                    ], check=True)
-                    print(f"Removed always on top for window {xid_hex}")
-            else:
+            # Only needed for this feature, so kept off the startup path
+            gi.require_version('GdkX11', '4.0')
+            from gi.repository import GdkX11
+            from x11_window import X11Connection
+            
+            if not isinstance(surface, GdkX11.X11Surface):
                 print("Not running on X11, always on top not supported")
-                
-        except subprocess.CalledProcessError as e:
-            print(f"wmctrl command failed: {e}")
-            print("Install wmctrl: sudo apt install wmctrl")
-        except Exception as e:
+                return
+            
+            # EWMH client message over our own connection; no wmctrl process
+            if self.x11 is None:
+                self.x11 = X11Connection(self.get_display().get_name())
+            self.x11.set_above(GdkX11.X11Surface.get_xid(surface), self.always_on_top_button.get_active())
+        except (ImportError, ValueError, OSError) as e:
             print(f"Could not set always on top: {e}")
-            print("This feature requires X11 and wmctrl")
+    
+    def open_path(self, path: str):
+        """Open a folder as a workspace, anything else as a task file"""
+        if Path(path).is_dir():
+            self.open_workspace(path)
+        else:
+            self.load_file(path)
     
     def load_file(self, file_path: str):
-        if self.parser.load_file(file_path):
-            self.file_label.set_text(Path(file_path).name)
-            self.settings.set_last_file(file_path)
-            self.refresh_task_list()
-            # Resize window to fit content
+        """Load a markdown file without blocking the window.
+        
+        A file that was open recently and hasn't changed since comes back
+        from self.recent_files with its rows already built. Otherwise the
+        file is read and parsed on a worker thread, then its rows are
+        added a chunk at a time from idle callbacks so the first screenful
+        shows up right away. Opening another file or a workspace before
+        the load finishes cancels it.
+        """
+        self.remember_file()
+        self.close_workspace()
+        self.file_watcher.stop()
+        self.parser.flush()
+        
+        cached = self.recent_files.take(file_path)
+        self.splice_items(0, self.task_store.get_n_items(), cached[1] if cached else [])
+        if cached:
+            self.pending_load = None
+            self.hide_progress()
+            self.show_file(file_path, cached[0])
+            self.start_watching(str(cached[0].file_path))
             GLib.idle_add(self.resize_to_fit_content)
-        else:
+            return
+        
+        # The old file's rows are gone; nothing may act on its parser while
+        # the new one loads, or after it fails to
+        self.show_no_file()
+        load = object()
+        self.pending_load = load
+        self.show_progress(f"Loading {Path(file_path).name}…")
+        
+        agenda = self.agenda_button.get_active()
+        
+        def read():
+            # Always post a result, or pending_load would block bulk actions
+            # and file switches for good
+            result = None
+            try:
+                parser = TaskParser(parse_cache=self.parse_cache)
+                if parser.load_file(file_path):
+                    parser.get_tree()
+                    parser.get_sections()
+                    if agenda:
+                        parser.get_agenda()
+                    result = parser
+            except (OSError, MemoryError) as e:
+                print(f"Could not load {file_path}: {e}")
+            finally:
+                GLib.idle_add(self.on_file_read, load, file_path, result)
+        
+        threading.Thread(target=read, daemon=True).start()
+    
+    def on_file_read(self, load, file_path: str, parser: TaskParser):
+        if load is not self.pending_load:
+            return False  # Superseded by another file or workspace
+        
+        if parser is None:
+            self.pending_load = None
+            self.hide_progress()
             self.show_error_dialog("Failed to load file", f"Could not load: {file_path}")
+            return False
+        
+        self.show_file(file_path, parser)
+        self.stream_tasks(load, 0)
+        return False  # Don't repeat this idle callback
+    
+    def show_no_file(self):
+        self.parser = TaskParser(parse_cache=self.parse_cache)
+        self.file_label.set_text("No file loaded")
+        self.update_completion()
+    
+    def show_file(self, file_path: str, parser: TaskParser):
+        self.parser = parser
+        self.file_label.set_text(Path(file_path).name)
+        self.update_completion()
+        self.settings.set_last_file(file_path)
+        self.add_recent(file_path)
+    
+    def remember_file(self):
+        """Keep the open file's parser and rows in the recent-files cache"""
+        if self.workspace or self.pending_load is not None or not self.parser.file_path:
+            return
+        items = [self.task_store.get_item(index) for index in range(self.task_store.get_n_items())]
+        self.recent_files.put(self.parser, items)
+    
+    def add_recent(self, path: str):
+        self.settings.add_recent_file(path)
+        self.update_recent_menu()
+    
+    def update_recent_menu(self):
+        self.recent_menu.remove_all()
+        for path in self.settings.get_recent_files():
+            label = f"{Path(path).name}/" if Path(path).is_dir() else Path(path).name
+            item = Gio.MenuItem.new(label, None)
+            item.set_action_and_target_value("win.open-recent", GLib.Variant.new_string(path))
+            self.recent_menu.append_item(item)
+    
+    @traced()
+    def stream_tasks(self, load, start: int):
+        """Append the next chunk of rows for the file being loaded"""
+        if load is not self.pending_load:
+            return False  # Superseded by another file or workspace
+        
+        tasks = self.parser.get_tasks()
+        end = min(start + self.LOAD_CHUNK, len(tasks))
+        self.splice_items(self.task_store.get_n_items(), 0,
+                          [self.create_task_item(tasks[index], index, self.parser) for index in range(start, end)])
+        
+        if end < len(tasks):
+            self.progress_bar.set_fraction(end / len(tasks))
+            GLib.idle_add(self.stream_tasks, load, end)
+            return False  # The next chunk is its own callback
+        
+        self.pending_load = None
+        self.hide_progress()
+        # Rows expanded while streaming only listed the children loaded then
+        self.sync_child_stores(self.parser)
+        self.queue_agenda_refresh()
+        # Watch only once every row is in, so external edits diff against a complete list
+        self.start_watching(str(self.parser.file_path))
+        GLib.idle_add(self.resize_to_fit_content)
+        return False  # Don't repeat this idle callback
+    
+    def show_progress(self, text: str):
+        self.progress_bar.set_text(text)
+        self.progress_bar.set_fraction(0)
+        self.progress_bar.set_visible(True)
+    
+    def hide_progress(self):
+        self.progress_bar.set_visible(False)
+    
+    def start_watching(self, file_path: str):
+        if self.parser.file_path == Path(file_path):
+            self.file_watcher.watch(file_path)
+        return False  # Don't repeat this idle callback
+    
+    def open_workspace(self, directory: str):
+        """Show the tasks of every markdown file under directory"""
+        self.remember_file()
+        self.close_workspace()
+        self.file_watcher.stop()
+        self.parser.flush()
+        self.pending_load = None
+        
+        workspace = Workspace(directory, parse_cache=self.parse_cache)
+        self.workspace = workspace
+        self.splice_items(0, self.task_store.get_n_items(), [])
+        self.file_label.set_text(f"{workspace.root.name}/ (indexing…)")
+        self.update_completion()
+        self.settings.set_last_file(directory)
+        self.add_recent(directory)
+        self.show_progress(f"Indexing {workspace.root.name}/…")
+        
+        # Index on a worker thread; parsed files arrive in path order and are
+        # appended to the list as they come in
+        def on_batch(parsers):
+            GLib.idle_add(self.add_workspace_files, workspace, parsers)
+        
+        def index():
+            workspace.index(on_batch)
+            GLib.idle_add(self.on_workspace_indexed, workspace)
+        
+        threading.Thread(target=index, daemon=True).start()
+    
+    def close_workspace(self):
+        if self.workspace:
+            self.workspace_watcher.stop()
+            self.workspace.flush()
+            self.workspace = None
+    
+    @traced()
+    def add_workspace_files(self, workspace: Workspace, parsers):
+        if workspace is not self.workspace:
+            return False  # Superseded by another file or workspace
+        
+        for parser in parsers:
+            self.insert_file_block(parser)
+        self.update_workspace_label()
+        self.progress_bar.pulse()
+        return False  # Don't repeat this idle callback
+    
+    def on_workspace_indexed(self, workspace: Workspace):
+        if workspace is self.workspace:
+            self.workspace_watcher.watch(str(workspace.root))
+            self.update_workspace_label()
+            self.hide_progress()
+        return False  # Don't repeat this idle callback
+    
+    def update_workspace_label(self):
+        workspace = self.workspace
+        self.file_label.set_text(f"{workspace.root.name}/ · {len(workspace.paths)} files · {workspace.task_count()} tasks")
+        self.update_completion()
+    
+    def update_completion(self):
+        """Show done/total from the parsers' section counters, which
+        toggles keep current, so this never rescans tasks"""
+        if self.workspace:
+            done, total = self.workspace.done_count(), self.workspace.task_count()
+        else:
+            sections = self.parser.get_sections()
+            done, total = sections.done_total, sections.total
+        self.completion_bar.set_visible(total > 0)
+        self.completion_label.set_visible(total > 0)
+        self.completion_bar.set_fraction(done / total if total else 0)
+        self.completion_label.set_text(f"{done}/{total}")
+        self.queue_agenda_refresh()
+    
+    def on_completion_tooltip(self, widget, x, y, keyboard_mode, tooltip):
+        # Built only when the tooltip is about to show
+        if self.workspace:
+            rows = [(self.workspace.title(path), self.workspace.parsers[path].get_sections())
+                    for path in self.workspace.paths]
+            lines = [f"{title}: {sections.done_total}/{sections.total}" for title, sections in rows]
+        else:
+            lines = [f"{'  ' * max(level - 1, 0)}{title or 'Before first heading'}: {done}/{total}"
+                     for title, level, _, done, total in self.parser.get_sections().entries()]
+        if not lines:
+            return False
+        tooltip.set_text('\n'.join(lines))
+        return True
+    
+    def insert_file_block(self, parser: TaskParser):
+        """Add a workspace file's header and tasks at its sorted position"""
+        position = self.workspace.add(parser)
+        if position == len(self.workspace.paths) - 1:
+            start = self.task_store.get_n_items()
+        else:
+            start = self.block_start(parser) - 1
+        self.splice_items(start, 0, self.build_block(parser))
+    
+    def remove_file_block(self, path: Path):
+        parser = self.workspace.parsers[path]
+        start = self.block_start(parser) - 1
+        self.workspace.remove(path)
+        self.splice_items(start, 1 + len(parser.get_tasks()), [])
+    
+    def block_start(self, parser: TaskParser) -> int:
+        """Model position of the first task of parser"""
+        if not self.workspace:
+            return 0
+        
+        position = 0
+        for path in self.workspace.paths:
+            position += 1  # File header
+            if path == parser.file_path:
+                return position
+            position += len(self.workspace.parsers[path].get_tasks())
+        raise KeyError(parser.file_path)
+    
+    def build_block(self, parser: TaskParser):
+        items = []
+        if self.workspace:
+            items.append(TaskItem.file_header(self.workspace.title(parser.file_path), parser))
+        items.extend(self.create_task_item(task, i, parser) for i, task in enumerate(parser.get_tasks()))
+        return items
     
+    @traced()
     def refresh_task_list(self):
-        # Clear existing widgets
-        while self.task_list.get_first_child():
-            self.task_list.remove(self.task_list.get_first_child())
+        # Replace the whole model in one splice so the view updates once
+        if self.workspace:
+            items = []
+            for path in self.workspace.paths:
+                items.extend(self.build_block(self.workspace.parsers[path]))
+        else:
+            items = self.build_block(self.parser)
+        self.splice_items(0, self.task_store.get_n_items(), items)
+    
+    def create_task_item(self, task: Task, index: int, parser: TaskParser):
+        item = TaskItem.from_task(task, index, parser)
+        item.update_tree(parser.get_tree())
+        item.connect("notify::completed", self.on_task_toggled)
+        item.connect("notify::text", self.on_task_text_changed)
+        return item
+    
+    @traced()
+    def splice_items(self, position: int, n_removed: int, items):
+        """Splice the task model, keeping the search index and matches in step"""
+        emptied = set()
+        if position == 0 and n_removed == self.task_store.get_n_items():
+            self.content_size.clear()
+            self.search_index.clear()
+            self.child_stores.clear()
+            self.search_matches = None if self.search_matches is None else set()
+            self.match_counts.clear()
+        else:
+            for index in range(position, position + n_removed):
+                item = self.task_store.get_item(index)
+                self.content_size.remove(item)
+                self.child_stores.pop(item, None)
+                if not item.is_header:
+                    self.search_index.remove(item)
+                    if self.set_matched(item, False):
+                        emptied.add(item.parser)
+        
+        for item in items:
+            self.content_size.add(item, item.text, item.is_header)
+        tasks = [item for item in items if not item.is_header]
+        self.search_index.extend((item, item.text, item.completed) for item in tasks)
+        filled = set()
+        if self.search_matches is not None:
+            for item in tasks:
+                if self.search_index.match(item, self.search_query, self.search_state):
+                    if self.set_matched(item, True):
+                        filled.add(item.parser)
+        
+        # New items are filtered as they are inserted
+        self.task_store.splice(position, n_removed, items)
+        count('rows_built', len(items))
+        
+        for parser in emptied ^ filled:
+            self.refilter_header(parser)
+    
+    def set_matched(self, item: TaskItem, matched: bool) -> bool:
+        """Record whether item matches the search; True if its file's header should toggle"""
+        if self.search_matches is None or matched == (item in self.search_matches):
+            return False
+        if matched:
+            self.search_matches.add(item)
+            self.match_counts[item.parser] += 1
+            return self.match_counts[item.parser] == 1
+        self.search_matches.discard(item)
+        self.match_counts[item.parser] -= 1
+        return self.match_counts[item.parser] == 0
+    
+    def filter_item(self, item):
+        if self.search_matches is None:
+            return True
+        if item.is_header:
+            return self.match_counts[item.parser] > 0
+        return item in self.search_matches
+    
+    @traced()
+    def on_search_changed(self, *args):
+        query = self.search_entry.get_text()
+        state = self.SEARCH_STATES[self.state_dropdown.get_selected()]
+        matches = self.search_index.search(query, state)
+        
+        # Tell the filter which way results moved so it only re-checks the
+        # items that can change: typing more narrows, deleting widens
+        change = Gtk.FilterChange.DIFFERENT
+        if matches is None:
+            change = Gtk.FilterChange.LESS_STRICT
+        elif self.search_matches is None:
+            change = Gtk.FilterChange.MORE_STRICT
+        elif state == self.search_state:
+            if query.lower().startswith(self.search_query.lower()):
+                change = Gtk.FilterChange.MORE_STRICT
+            elif self.search_query.lower().startswith(query.lower()):
+                change = Gtk.FilterChange.LESS_STRICT
+        elif query == self.search_query and self.search_state is None:
+            change = Gtk.FilterChange.MORE_STRICT
+        elif query == self.search_query and state is None:
+            change = Gtk.FilterChange.LESS_STRICT
         
-        self.task_checkboxes.clear()
+        self.search_query = query
+        self.search_state = state
+        self.search_matches = matches
+        self.match_counts = Counter(item.parser for item in matches) if matches else Counter()
+        self.task_filter.changed(change)
         
-        # Add task checkboxes
-        for i, task in enumerate(self.parser.get_tasks()):
-            task_row = self.create_task_row(task, i)
-            self.task_list.append(task_row)
+        self.update_view()
     
-    def create_task_row(self, task: Task, index: int):
+    def update_view(self):
+        # Search matches are listed flat; the tree comes back once the search
+        # is cleared. A sort order or the agenda replaces both while on.
+        if self.agenda_button.get_active():
+            view = self.agenda_view
+        elif self.sorted_tasks.get_sorter():
+            view = self.sorted_view
+        else:
+            view = self.tree_view if self.search_matches is None else self.search_view
+        if self.task_list.get_model() is not view:
+            self.task_list.set_model(view)
+    
+    def on_sort_changed(self, *args):
+        sorters = []
+        self.sort_properties = set()
+        if self.open_first_button.get_active():
+            sorters.append(Gtk.NumericSorter.new(Gtk.PropertyExpression.new(TaskItem, None, "completed")))
+            self.sort_properties.add("completed")
+        sort_property = self.SORT_PROPERTIES[self.sort_dropdown.get_selected()]
+        if sort_property:
+            self.sort_properties.add(sort_property)
+        if sort_property == "text":
+            sorter = Gtk.StringSorter.new(Gtk.PropertyExpression.new(TaskItem, None, "text"))
+            sorter.set_ignore_case(True)
+            sorters.append(sorter)
+        elif sort_property:
+            sorters.append(Gtk.NumericSorter.new(Gtk.PropertyExpression.new(TaskItem, None, sort_property)))
+        
+        if sorters:
+            sorter = Gtk.MultiSorter()
+            for part in sorters:
+                sorter.append(part)
+            # Only kept connected to the task model while it is shown
+            self.sortable_tasks.set_model(self.filtered_tasks)
+            self.sorted_tasks.set_sorter(sorter)
+        else:
+            self.sorted_tasks.set_sorter(None)
+            self.sortable_tasks.set_model(None)
+        self.update_view()
+    
+    def resort_item(self, item: TaskItem, changed_property: str):
+        """Move one row to its new place in the sorted view if it is ordered
+        by the property that changed"""
+        if changed_property in self.sort_properties:
+            # Deferred so a row is not rebuilt from inside its own checkbox signal
+            GLib.idle_add(self.refilter_item, item)
+    
+    def on_agenda_toggled(self, button):
+        self.agenda_refresh_queued = False
+        self.refresh_agenda()
+        self.update_view()
+    
+    def queue_agenda_refresh(self):
+        # Deferred so a row is not rebuilt from inside its own checkbox
+        # signal, and so a batch of changes refreshes the agenda once
+        if self.agenda_button.get_active() and not self.agenda_refresh_queued:
+            self.agenda_refresh_queued = True
+            GLib.idle_add(self.refresh_agenda)
+    
+    @traced()
+    def refresh_agenda(self):
+        """List the next AGENDA_SIZE tasks across the open file or workspace.
+        
+        Each parser's agenda answers its own top-N from a heap, and those
+        short lists are merged, so this never walks all tasks.
+        """
+        self.agenda_refresh_queued = False
+        if not self.agenda_button.get_active():
+            self.agenda_store.remove_all()
+            return False
+        if self.pending_load is not None:
+            # Rows are still streaming in; refreshed once they are all there
+            self.agenda_store.remove_all()
+            return False
+        
+        if self.workspace:
+            parsers = [self.workspace.parsers[path] for path in self.workspace.paths]
+        else:
+            parsers = [self.parser] if self.parser.file_path else []
+        entries = []
+        base = 0
+        for parser in parsers:
+            if self.workspace:
+                base += 1  # File header
+            agenda = parser.get_agenda()
+            entries.extend((agenda.sort_key(index), base + index) for index in agenda.top(self.AGENDA_SIZE))
+            base += len(parser.get_tasks())
+        
+        items = [self.task_store.get_item(position) for _, position in heapq.nsmallest(self.AGENDA_SIZE, entries)]
+        current = [self.agenda_store.get_item(position) for position in range(self.agenda_store.get_n_items())]
+        if items != current:
+            self.agenda_store.splice(0, len(current), items)
+        return False  # Don't repeat this idle callback
+    
+    def update_search(self, item: TaskItem):
+        """Re-index an item whose text or state changed and re-filter just its row"""
+        self.search_index.update(item, item.text, item.completed)
+        if self.search_matches is None:
+            return
+        
+        matched = self.search_index.match(item, self.search_query, self.search_state)
+        if matched != (item in self.search_matches):
+            header_changed = self.set_matched(item, matched)
+            # Defer so a row is not rebuilt from inside its own checkbox signal
+            GLib.idle_add(self.refilter_item, item)
+            if header_changed:
+                GLib.idle_add(self.refilter_header, item.parser)
+    
+    def refilter_item(self, item: TaskItem):
+        position = self.block_start(item.parser) + item.index
+        if position < self.task_store.get_n_items() and self.task_store.get_item(position) is item:
+            self.task_store.items_changed(position, 1, 1)
+        return False  # Don't repeat this idle callback
+    
+    def refilter_header(self, parser: TaskParser):
+        if self.workspace and parser.file_path in self.workspace.parsers:
+            position = self.block_start(parser) - 1
+            self.task_store.items_changed(position, 1, 1)
+        return False  # Don't repeat this idle callback
+    
+    def on_task_row_setup(self, factory, list_item):
         row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
         row.set_margin_start(5)
         row.set_margin_end(5)
+        row.set_margin_top(2)
+        row.set_margin_bottom(2)
         
         # Checkbox
         checkbox = Gtk.CheckButton()
-        checkbox.set_active(task.completed)
-        checkbox.connect("toggled", self.on_task_toggled, index)
-        self.task_checkboxes.append(checkbox)
         
         # Task text
-        label = Gtk.Label(label=task.text)
+        label = Gtk.Label()
         label.set_xalign(0.0)
         label.set_hexpand(True)
         label.set_wrap(True)
         
-        # Apply strikethrough style if completed
-        if task.completed:
-            label.add_css_class("strikethrough")
+        # Done/total of nested tasks
+        progress = Gtk.Label()
+        progress.add_css_class("dim-label")
         
         row.append(checkbox)
         row.append(label)
+        row.append(progress)
+        
+        # Indents nested rows and shows their expand arrow
+        expander = Gtk.TreeExpander()
+        expander.set_child(row)
+        list_item.set_child(expander)
+    
+    def on_task_row_bind(self, factory, list_item):
+        expander = list_item.get_child()
+        row = expander.get_child()
+        checkbox = row.get_first_child()
+        label = checkbox.get_next_sibling()
+        progress = row.get_last_child()
+        
+        # Tree rows wrap the item; search results are plain items
+        item = list_item.get_item()
+        if isinstance(item, Gtk.TreeListRow):
+            expander.set_list_row(item)
+            item = item.get_item()
+        else:
+            expander.set_list_row(None)
+        row.item = item
+        
+        checkbox.set_visible(not item.is_header)
+        if item.is_header:
+            label.add_css_class("file-header")
+        else:
+            label.remove_css_class("file-header")
+        
+        flags = GObject.BindingFlags.SYNC_CREATE
+        row.bindings = [
+            item.bind_property("completed", checkbox, "active", flags | GObject.BindingFlags.BIDIRECTIONAL),
+            item.bind_property("text", label, "label", flags),
+            item.bind_property("progress", progress, "label", flags),
+        ]
+        row.style_handler = item.connect("notify::completed", self.update_row_style, label)
+        self.update_row_style(item, None, label)
+    
+    def on_task_row_unbind(self, factory, list_item):
+        row = list_item.get_child().get_child()
+        for binding in row.bindings:
+            binding.unbind()
+        row.item.disconnect(row.style_handler)
+        row.bindings = []
+        row.item = None
+    
+    def update_row_style(self, item, pspec, label):
+        # Apply strikethrough style if completed
+        if item.completed:
+            label.add_css_class("strikethrough")
+        else:
+            label.remove_css_class("strikethrough")
+    
+    def on_task_text_changed(self, item, pspec):
+        self.content_size.update(item, item.text, item.is_header)
+        self.update_search(item)
+        self.resort_item(item, "text")
+    
+    def on_task_toggled(self, item, pspec):
+        self.update_search(item)
+        self.resort_item(item, "completed")
+        # Items also change when external edits are applied; only write
+        # back when the model differs from what the parser already has
+        task = item.parser.get_tasks()[item.index]
+        if task.completed == item.completed:
+            return
+        
+        parser = item.parser
+        tree = parser.get_tree()
+        base = self.block_start(parser)
+        if item.has_children and self.settings.get_cascade_completion():
+            # One write for the whole subtree; the nested items then match
+            # the parser, so their own notifications write nothing
+            parser.set_subtree_status(item.index, item.completed)
+            # Rows not streamed in yet are built from the parser later
+            end = min(tree.ends[item.index], self.task_store.get_n_items() - base)
+            for index in range(item.index + 1, end):
+                child = self.task_store.get_item(base + index)
+                child.completed = item.completed
+                child.update_tree(tree)
+        else:
+            parser.update_task_status(item.index, item.completed)
+        
+        # Only the rollups on the path to the root change
+        item.update_tree(tree)
+        for index in tree.ancestors(item.index):
+            self.task_store.get_item(base + index).update_tree(tree)
+        self.update_completion()
+    
+    def run_bulk_action(self, handler):
+        # Rows of a file still streaming in don't all exist yet
+        if self.pending_load is None and (self.workspace or self.parser.file_path):
+            handler()
+    
+    def selected_items(self):
+        """Selected task rows of the current view, in view order"""
+        model = self.task_list.get_model()
+        selection = model.get_selection()
+        items = []
+        for n in range(selection.get_size()):
+            item = model.get_item(selection.get_nth(n))
+            if isinstance(item, Gtk.TreeListRow):
+                item = item.get_item()
+            if not item.is_header:
+                items.append(item)
+        return items
+    
+    def task_items(self):
+        items = (self.task_store.get_item(position) for position in range(self.task_store.get_n_items()))
+        return [item for item in items if not item.is_header]
+    
+    @traced()
+    def set_items_completed(self, items, completed: bool):
+        """Set many tasks at once: one parser call, and so one write, per
+        file, then one search, filter, rollup and progress update"""
+        by_parser = {}
+        for item in items:
+            if item.completed != completed:
+                by_parser.setdefault(item.parser, []).append(item)
+        if not by_parser:
+            return
+        
+        changed_items = []
+        for parser, changed in by_parser.items():
+            parser.update_task_statuses([(item.index, completed) for item in changed])
+            # on_task_toggled would re-filter and re-sort every row on its
+            # own; the batch is re-indexed and re-filtered once below
+            for item in changed:
+                with item.handler_block_by_func(self.on_task_toggled):
+                    item.completed = completed
+            self.update_rollups(parser, [item.index for item in changed])
+            changed_items.extend(changed)
+        
+        self.search_index.set_completed_many(changed_items, completed)
+        if self.search_matches is not None:
+            for item in changed_items:
+                self.set_matched(item, self.search_index.match(item, self.search_query, self.search_state))
+            # Also re-checks the file headers whose match counts changed
+            self.task_filter.changed(Gtk.FilterChange.DIFFERENT)
+        if "completed" in self.sort_properties:
+            self.sorted_tasks.get_sorter().changed(Gtk.SorterChange.DIFFERENT)
+        self.update_completion()
+    
+    def update_rollups(self, parser: TaskParser, indices):
+        """Refresh the rows at indices and their ancestors after only
+        statuses changed, leaving the nesting as it is"""
+        tree = parser.get_tree()
+        base = self.block_start(parser)
+        touched = set()
+        for index in indices:
+            touched.add(index)
+            touched.update(tree.ancestors(index))
+        for index in touched:
+            self.task_store.get_item(base + index).update_tree(tree)
+    
+    def complete_selected_sections(self):
+        """Complete every task under the headings of the selected tasks"""
+        items = []
+        for parser, indices in self.group_by_parser(self.selected_items()).items():
+            sections = parser.get_sections()
+            base = self.block_start(parser)
+            for section in sorted({sections.section_of[index] for index in indices}):
+                items.extend(self.task_store.get_item(base + index) for index in sections.task_range(section))
+        self.set_items_completed(items, True)
+    
+    @staticmethod
+    def group_by_parser(items):
+        groups = {}
+        for item in items:
+            groups.setdefault(item.parser, []).append(item.index)
+        return groups
+    
+    def confirm_remove_completed(self):
+        dialog = Gtk.MessageDialog(
+            transient_for=self,
+            modal=True,
+            message_type=Gtk.MessageType.QUESTION,
+            buttons=Gtk.ButtonsType.OK_CANCEL,
+            text="Remove completed tasks?"
+        )
+        dialog.format_secondary_text("Their lines are deleted from the file.")
+        
+        def on_response(dialog, response):
+            dialog.destroy()
+            if response == Gtk.ResponseType.OK:
+                self.run_bulk_action(self.remove_completed)
+        
+        dialog.connect("response", on_response)
+        dialog.present()
+    
+    @traced()
+    def remove_completed(self):
+        """Delete every completed task line, one re-parse, write and model splice per file"""
+        parsers = [self.workspace.parsers[path] for path in self.workspace.paths] if self.workspace else [self.parser]
+        for parser in parsers:
+            completed = parser.get_tasks().completed
+            indices = [index for index, done in enumerate(completed) if done]
+            if indices:
+                self.apply_task_diff(parser.remove_tasks(indices), parser)
+        if self.workspace:
+            self.update_workspace_label()
+    
+    def create_child_model(self, item):
+        """Nested tasks of a tree row, created when it is expanded"""
+        if item.is_header or not item.has_children:
+            return None
+        store = self.child_stores.get(item)
+        if store is None:
+            store = Gio.ListStore.new(TaskItem)
+            store.splice(0, 0, self.child_items(item))
+            self.child_stores[item] = store
+        return store
+    
+    def child_items(self, item):
+        base = self.block_start(item.parser)
+        # While a file streams in, only its rows built so far exist
+        loaded = self.task_store.get_n_items() - base
+        return [self.task_store.get_item(base + index)
+                for index in item.parser.get_tree().children(item.index) if index < loaded]
+    
+    @traced()
+    def refresh_tree(self, parser: TaskParser, first: int, end: int):
+        """Bring nesting, rollups and expanded rows up to date after the
+        tasks first .. end - 1 of parser changed.
+        
+        Above them, only the tasks still open at first can have changed:
+        the one before it and that one's ancestors. Below them, tasks are
+        walked until one that was and still is top-level, from where the
+        nesting is what it was.
+        """
+        tree = parser.get_tree()
+        base = self.block_start(parser)
+        reshaped = set()
+        
+        def update(index: int) -> bool:
+            item = self.task_store.get_item(base + index)
+            if not item.update_tree(tree):
+                return False
+            reshaped.add(item)
+            # Re-filters the item into or out of the root level
+            self.task_store.items_changed(base + index, 1, 1)
+            return True
+        
+        if first > 0:
+            for index in [first - 1, *tree.ancestors(first - 1)]:
+                update(index)
+        for index in range(first, end):
+            update(index)
+        for index in range(end, len(tree)):
+            if not update(index) and tree.parents[index] < 0:
+                break
+        self.sync_child_stores(parser, reshaped)
+    
+    def sync_child_stores(self, parser: TaskParser, reshaped=frozenset()):
+        """Re-list the children of expanded rows of parser that changed"""
+        for item, store in list(self.child_stores.items()):
+            if item.parser is not parser:
+                continue
+            children = self.child_items(item)
+            current = [store.get_item(index) for index in range(store.get_n_items())]
+            if children != current or reshaped.intersection(children):
+                store.splice(0, store.get_n_items(), children)
+    
+    def on_file_changed(self):
+        """Read the open file on a worker thread after it changed on disk.
+        
+        The worker also diffs it against the tasks and rebuilds whatever
+        the edit invalidates, so the main loop only swaps the results in.
+        Our own saves leave the file with the identity the parser already
+        knows, so those are skipped without reading it.
+        """
+        parser = self.parser
         
-        return row
+        def read():
+            snapshot = parser.read_from_disk()
+            if snapshot and snapshot.content is not None:
+                GLib.idle_add(self.on_file_read_back, parser, snapshot)
+        
+        threading.Thread(target=read, daemon=True).start()
+        return False  # Don't repeat this idle callback
+    
+    @traced()
+    def on_file_read_back(self, parser: TaskParser, snapshot: DiskSnapshot):
+        """Apply an external edit of the open file to the task list"""
+        if parser is not self.parser or self.pending_load is not None:
+            return False  # Another file was opened meanwhile
+        
+        diff = parser.apply_snapshot(snapshot)
+        if diff is None:
+            # Tasks were toggled or another read landed first; read again
+            return self.on_file_changed()
+        if not diff.is_empty():
+            self.apply_task_diff(diff)
+        return False  # Don't repeat this idle callback
     
-    def on_task_toggled(self, checkbox, task_index):
-        completed = checkbox.get_active()
-        if self.parser.update_task_status(task_index, completed):
-            # Update label styling
-            row = checkbox.get_parent()
-            label = row.get_last_child()
+    @traced()
+    def on_workspace_changed(self, paths):
+        """Re-index only the workspace files that changed on disk"""
+        if not self.workspace:
+            return False
+        
+        for path in map(Path, sorted(paths)):
+            parser = self.workspace.parsers.get(path)
+            if parser and not path.exists():
+                self.remove_file_block(path)
+            elif parser:
+                diff = parser.refresh_from_disk()
+                if diff and not diff.is_empty():
+                    self.apply_task_diff(diff, parser)
+            elif self.workspace.is_markdown(path) and path.is_file():
+                parser = self.workspace.load(path)
+                if parser:
+                    self.insert_file_block(parser)
+        
+        self.update_workspace_label()
+        return False  # Don't repeat this idle callback
+    
+    @traced()
+    def apply_task_diff(self, diff: TaskDiff, parser: TaskParser = None):
+        """Update only the model items touched by an incremental re-parse"""
+        parser = parser or self.parser
+        tasks = parser.get_tasks()
+        base = self.block_start(parser)
+        
+        for index in diff.changed:
+            self.task_store.get_item(base + index).update_from(tasks[index])
+        
+        if diff.removed or diff.added:
+            items = [self.create_task_item(task, diff.position + offset, parser)
+                     for offset, task in enumerate(diff.added)]
+            self.splice_items(base + diff.position, diff.removed, items)
             
-            if completed:
-                label.add_css_class("strikethrough")
+            # Items after the splice point moved; keep their parser index in step
+            if len(items) != diff.removed:
+                for index in range(diff.position + len(items), len(tasks)):
+                    self.task_store.get_item(base + index).index = index
+        
+        if diff.reshaped:
+            if diff.changed:
+                self.refresh_tree(parser, diff.changed[0], diff.changed[-1] + 1)
             else:
-                label.remove_css_class("strikethrough")
+                self.refresh_tree(parser, diff.position, diff.position + len(diff.added))
+        else:
+            self.update_rollups(parser, diff.changed)
+        self.update_completion()
+    
+    def measure_row(self, text: str, is_header: bool):
+        """Natural pixel size of one list row showing text"""
+        if self.measure_layout is None:
+            # Lay out text the way row labels do, with the widget's current font
+            self.measure_layout = self.task_list.create_pango_layout(None)
+            self.bold_attributes = Pango.AttrList()
+            self.bold_attributes.insert(Pango.attr_weight_new(Pango.Weight.BOLD))
+            checkbox = Gtk.CheckButton()
+            self.checkbox_size = (self.measure_natural(checkbox, Gtk.Orientation.HORIZONTAL),
+                                  self.measure_natural(checkbox, Gtk.Orientation.VERTICAL))
+        
+        layout = self.measure_layout
+        layout.set_attributes(self.bold_attributes if is_header else None)
+        layout.set_text(text, -1)
+        width, height = layout.get_pixel_size()
+        
+        # Row margins and spacing match on_task_row_setup
+        width += 10
+        if not is_header:
+            width += self.checkbox_size[0] + 10
+            height = max(height, self.checkbox_size[1])
+        return width, height + 4 + self.ROW_SPACING
+    
+    @staticmethod
+    def measure_natural(widget, orientation) -> int:
+        return widget.measure(orientation, -1)[1]
+    
+    def on_font_changed(self, settings, pspec):
+        self.measure_layout = None
+        self.content_size.remeasure()
+        GLib.idle_add(self.resize_to_fit_content)
     
+    @traced()
     def resize_to_fit_content(self):
         """Resize window to fit task content with screen bounds constraints"""
         try:
@@ -230,26 +1305,14 @@ class TaskTrackerWindow(Gtk.ApplicationWindow):
             screen_width = geometry.width
             screen_height = geometry.height
             
-            # Calculate content size
-            num_tasks = len(self.parser.get_tasks())
-            
-            # Base window size (toolbar + margins + padding)
-            base_height = 45   # Toolbar + margins (minimal)
+            # Toolbar, search bar, box spacing and margins
+            chrome_height = sum(self.measure_natural(bar, Gtk.Orientation.VERTICAL)
+                                for bar in (self.toolbar, self.search_bar)) + 10 + 20
             base_width = 300   # Minimum useful width
             
-            # Calculate height based on tasks (precise fit)
-            task_height = 22   # Height per task row (tight fit)
-            spacing = 5        # Spacing between tasks
-            content_height = base_height + (num_tasks * task_height) + ((num_tasks - 1) * spacing) if num_tasks > 0 else base_height
-            
-            # Calculate width based on longest task text
-            max_task_width = 0
-            for task in self.parser.get_tasks():
-                # Rough character width estimation (8 pixels per char)
-                task_width = len(task.text) * 8 + 60  # 60px for checkbox + margins
-                max_task_width = max(max_task_width, task_width)
-            
-            content_width = max(base_width, max_task_width)
+            # Both sums are maintained as rows come and go
+            content_height = chrome_height + self.content_size.total_height
+            content_width = max(base_width, self.content_size.max_width + 20)
             
             # Apply screen bounds constraints (leave 10% margin on each side)
             max_width = int(screen_width * 0.8)
@@ -265,7 +1328,7 @@ class TaskTrackerWindow(Gtk.ApplicationWindow):
             # Save the new geometry
             self.settings.set_window_geometry(new_width, new_height)
             
-            print(f"Resized window to {new_width}x{new_height} for {num_tasks} tasks")
+            print(f"Resized window to {new_width}x{new_height} for {len(self.content_size)} rows")
             
         except Exception as e:
             print(f"Error resizing window: {e}")
@@ -285,11 +1348,52 @@ class TaskTrackerWindow(Gtk.ApplicationWindow):
         dialog.present()
 
 class TaskTrackerApp(Gtk.Application):
+    """Single-instance application.
+    
+    A second launch normally never gets here: remote_launch hands its
+    files to the first one over the session bus before GTK is imported.
+    Launches with options still go through GApplication, which forwards
+    the command line and exits without building any UI. The running
+    instance opens the files it was given, if any, and presents its
+    window.
+    """
+    
     def __init__(self):
-        super().__init__(application_id="com.example.tasktracker")
-        
+        flags = Gio.ApplicationFlags.HANDLES_OPEN | Gio.ApplicationFlags.HANDLES_COMMAND_LINE
+        if os.environ.get('TASK_TRACKER_STARTUP_PROBE'):
+            # Startup benchmarks must measure a cold start every run
+            flags |= Gio.ApplicationFlags.NON_UNIQUE
+        super().__init__(application_id=APPLICATION_ID, flags=flags)
+        self.window: Optional[TaskTrackerWindow] = None
+    
+    def do_command_line(self, command_line):
+        # Runs in the primary instance; relative paths resolve against the
+        # working directory of the launch that sent them
+        files = [command_line.create_file_for_arg(arg) for arg in command_line.get_arguments()[1:]]
+        if files:
+            self.open(files, "")
+        else:
+            self.activate()
+        return 0
+    
+    def do_open(self, files, n_files, hint):
+        paths = [f.get_path() for f in files if f.get_path()]
+        if not paths:
+            self.do_activate()
+            return
+        # One window shows one file or workspace, so the last one wins
+        if self.window:
+            self.window.open_path(paths[-1])
+            self.window.present()
+        else:
+            self.create_window(paths[-1]).present()
+    
     def do_activate(self):
-        window = TaskTrackerWindow(self)
+        (self.window or self.create_window()).present()
+    
+    def create_window(self, initial_path: Optional[str] = None) -> TaskTrackerWindow:
+        window = TaskTrackerWindow(self, initial_path)
+        self.window = window
         
         # Add CSS for strikethrough
         css_provider = Gtk.CssProvider()
@@ -298,6 +1402,10 @@ class TaskTrackerApp(Gtk.Application):
             text-decoration: line-through;
             opacity: 0.7;
         }
+        .file-header {
+            font-weight: bold;
+            margin-top: 6px;
+        }
         """)
         
         Gtk.StyleContext.add_provider_for_display(
@@ -306,11 +1414,44 @@ class TaskTrackerApp(Gtk.Application):
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
         )
         
-        window.present()
+        if os.environ.get('TASK_TRACKER_STARTUP_PROBE'):
+            self.install_startup_probe(window)
+        return window
+    
+    def install_startup_probe(self, window):
+        """Report when the window is mapped and first painted, then quit.
+        
+        Used by benchmarks/startup_benchmark.py; timestamps are
+        time.monotonic() so they can be compared with the launcher's.
+        """
+        def on_map(widget):
+            print(f"startup-probe map {time.monotonic():.6f}", flush=True)
+            frame_clock = widget.get_frame_clock()
+            frame_clock.connect("after-paint", on_after_paint)
+        
+        def on_after_paint(frame_clock):
+            frame_clock.disconnect_by_func(on_after_paint)
+            print(f"startup-probe frame {time.monotonic():.6f}", flush=True)
+            GLib.idle_add(self.quit)
+        
+        window.connect("map", on_map)
+    
+    def do_shutdown(self):
+        # Normally done on close-request already; covers quitting without one
+        if self.window:
+            self.window.shutdown()
+        Gtk.Application.do_shutdown(self)
 
 def main():
+    # --trace FILE records spans and counters, like TASK_TRACKER_TRACE=FILE
+    argv = list(sys.argv)
+    if '--trace' in argv[1:-1]:
+        position = argv.index('--trace')
+        instrumentation.enable(argv[position + 1])
+        del argv[position:position + 2]
+    
     app = TaskTrackerApp()
-    return app.run(sys.argv)
+    return app.run(argv)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
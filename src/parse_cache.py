@@ -0,0 +1,140 @@
+import hashlib
+import os
+import struct
+from pathlib import Path
+from typing import Optional
+from save_queue import atomic_write
+from task_store import TaskStore
+
+def default_cache_dir() -> Path:
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'task-tracker' / 'parse-index'
+
+class ParseCache:
+    """On-disk cache of parsed task indexes, keyed on file identity.
+    
+    An entry is reused only when the file's path, size, mtime_ns and inode
+    all match what was recorded, and (unless disabled) the BLAKE2 digest of
+    its content too. Entries are the raw TaskStore columns behind a small
+    header. Hits refresh an entry's mtime, and the least recently used
+    entries are evicted once the directory grows past ``max_bytes``.
+    """
+    MAGIC = b'TTIX'
+    # Bump whenever the task grammar or the TaskStore columns change
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct('<4sHxxQqQQ32sI')
+    
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = 64 * 1024 * 1024,
+                 min_file_size: int = 64 * 1024, verify_content: bool = True):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+        # Small files parse faster than an entry can be checked
+        self.min_file_size = min_file_size
+        self.verify_content = verify_content
+    
+    def _entry_path(self, file_path: Path) -> Path:
+        key = hashlib.sha1(str(Path(file_path).resolve()).encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.idx"
+    
+    def _digest(self, content: bytes) -> bytes:
+        if not self.verify_content:
+            return bytes(32)
+        return hashlib.blake2b(content, digest_size=32).digest()
+    
+    def load(self, file_path: Path, content: bytearray) -> Optional[TaskStore]:
+        """Return the cached tasks for content read from file_path, or None"""
+        if len(content) < self.min_file_size:
+            return None
+        
+        entry_path = self._entry_path(file_path)
+        try:
+            stat = os.stat(file_path)
+            with open(entry_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        
+        try:
+            magic, version, size, mtime_ns, inode, count, digest, path_length = self.HEADER.unpack_from(data)
+            position = self.HEADER.size
+            path = data[position:position + path_length].decode('utf-8')
+            position += path_length
+            
+            valid = (magic == self.MAGIC and version == self.FORMAT_VERSION
+                     and path == str(Path(file_path).resolve())
+                     and size == stat.st_size == len(content)
+                     and mtime_ns == stat.st_mtime_ns and inode == stat.st_ino
+                     and digest == self._digest(content))
+            if not valid:
+                self.invalidate(file_path)
+                return None
+            
+            tasks = TaskStore(content)
+            tasks.completed = bytearray(data[position:position + count])
+            position += count
+            for column in (tasks.line_numbers, tasks.status_offsets, tasks.text_ends):
+                end = position + count * column.itemsize
+                column.frombytes(data[position:end])
+                position = end
+            if position != len(data):
+                raise ValueError("trailing data")
+        except (struct.error, UnicodeDecodeError, ValueError):
+            self.invalidate(file_path)
+            return None
+        
+        # Mark the entry as recently used for eviction
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return tasks
+    
+    def store(self, file_path: Path, tasks: TaskStore):
+        """Record the tasks parsed from file_path, whose content is tasks.content"""
+        content = tasks.content
+        if len(content) < self.min_file_size:
+            return
+        
+        try:
+            stat = os.stat(file_path)
+            if stat.st_size != len(content):
+                return
+            
+            path = str(Path(file_path).resolve()).encode('utf-8')
+            header = self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, stat.st_size, stat.st_mtime_ns,
+                                      stat.st_ino, len(tasks), self._digest(content), len(path))
+            data = b''.join((header, path, bytes(tasks.completed), tasks.line_numbers.tobytes(),
+                             tasks.status_offsets.tobytes(), tasks.text_ends.tobytes()))
+            
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write(self._entry_path(file_path), data)
+            self._evict()
+        except OSError as e:
+            print(f"Could not write parse cache: {e}")
+    
+    def invalidate(self, file_path: Path):
+        """Drop the cached entry for file_path, if any"""
+        try:
+            os.unlink(self._entry_path(file_path))
+        except OSError:
+            pass
+    
+    def _evict(self):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        for entry in self.cache_dir.glob('*.idx'):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+                total -= size
+            except OSError:
+                pass
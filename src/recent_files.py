@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+from task_parser import TaskParser
+from instrumentation import count
+
+class RecentFiles:
+    """In-memory LRU of parsers for files that were open recently.
+    
+    Switching back to a cached file reuses its parsed tasks, and the list
+    items built for them, instead of reading and parsing it again. An
+    entry is only handed out while the file still has the size, mtime_ns
+    and inode it had when it was last read or written; otherwise it is
+    dropped and the file is loaded as usual. The cache is bounded by
+    entry count and by an estimate of the memory the entries hold.
+    """
+    # Rough cost of one list item (a GObject with a few properties)
+    ITEM_BYTES = 512
+    
+    def __init__(self, max_entries: int = 8, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: 'OrderedDict[Path, Tuple[TaskParser, List[Any], int]]' = OrderedDict()
+        self.size = 0
+    
+    @staticmethod
+    def estimate_size(parser: TaskParser, items: List[Any]) -> int:
+        # Content plus the TaskStore, TaskTree and TaskSections columns
+        return len(parser.content) + 25 * len(parser.get_tasks()) + RecentFiles.ITEM_BYTES * len(items)
+    
+    def put(self, parser: TaskParser, items: List[Any]):
+        """Keep a parser that is being switched away from, with its items.
+        
+        Queued writes are flushed first so the parser matches the file.
+        """
+        parser.flush()
+        path = parser.file_path.resolve()
+        self.discard(path)
+        size = self.estimate_size(parser, items)
+        if size > self.max_bytes or not parser.is_current():
+            return
+        
+        self.entries[path] = (parser, items, size)
+        self.size += size
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, (_, _, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+    
+    def take(self, path) -> Optional[Tuple[TaskParser, List[Any]]]:
+        """Remove and return the parser and items cached for path, if the
+        file hasn't changed since"""
+        entry = self.entries.pop(Path(path).resolve(), None)
+        if entry is None:
+            return None
+        parser, items, size = entry
+        self.size -= size
+        if not parser.is_current():
+            count('recent_file_stale')
+            return None
+        count('recent_file_hits')
+        return parser, items
+    
+    def discard(self, path):
+        entry = self.entries.pop(Path(path).resolve(), None) if path else None
+        if entry:
+            self.size -= entry[2]
@@ -0,0 +1,47 @@
+# typing costs more to import than the rest of this path; annotations
+# stay unevaluated instead
+from __future__ import annotations
+import os
+
+APPLICATION_ID = "com.example.tasktracker"
+# Where GApplication exports its org.gtk.Application interface
+OBJECT_PATH = "/" + APPLICATION_ID.replace('.', '/')
+
+def forward_to_running_instance(argv: list[str]) -> int | None:
+    """Hand a repeat launch to the running instance, loading only Gio.
+    
+    Calls the instance's org.gtk.Application Open or Activate method
+    directly, which is what a remote Gtk.Application would do after GTK
+    and every app module had been imported. Paths resolve against this
+    process's working directory. Returns the exit status, or None if no
+    instance answered and this process has to start the app itself.
+    Options are left to the full app.
+    """
+    args = argv[1:]
+    if os.environ.get('TASK_TRACKER_STARTUP_PROBE') or any(arg.startswith('-') for arg in args):
+        return None
+    
+    import gi
+    gi.require_version('Gio', '2.0')
+    from gi.repository import Gio, GLib
+    
+    # Lets the window manager give the running window focus
+    platform_data = {key: GLib.Variant('s', os.environ[variable])
+                     for key, variable in (('desktop-startup-id', 'DESKTOP_STARTUP_ID'),
+                                           ('activation-token', 'XDG_ACTIVATION_TOKEN'))
+                     if os.environ.get(variable)}
+    if args:
+        uris = [Gio.File.new_for_commandline_arg(arg).get_uri() for arg in args]
+        method, parameters = 'Open', GLib.Variant('(assa{sv})', (uris, '', platform_data))
+    else:
+        method, parameters = 'Activate', GLib.Variant('(a{sv})', (platform_data,))
+    
+    try:
+        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        # Fails instead of starting the app by D-Bus activation when no
+        # instance is running
+        bus.call_sync(APPLICATION_ID, OBJECT_PATH, 'org.gtk.Application', method, parameters,
+                      None, Gio.DBusCallFlags.NO_AUTO_START, -1, None)
+    except GLib.Error:
+        return None
+    return 0
@@ -0,0 +1,121 @@
+import atexit
+import fcntl
+import hashlib
+import os
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+# (size, mtime_ns, inode) of a file, compared before writing to detect edits made elsewhere
+FileIdentity = Tuple[int, int, int]
+
+def file_identity(path: Path) -> Optional[FileIdentity]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+def lock_dir() -> Path:
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    return Path(runtime_dir or tempfile.gettempdir()) / 'task-tracker-locks'
+
+@contextmanager
+def file_lock(path: Path):
+    """Hold an advisory lock shared by every instance writing path.
+    
+    The lock lives in a separate file under the runtime directory, keyed
+    by the resolved path, because atomic writes replace the file's inode
+    and would drop a lock taken on the file itself.
+    """
+    directory = lock_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    name = hashlib.blake2b(str(Path(path).resolve()).encode('utf-8'), digest_size=16).hexdigest()
+    fd = os.open(directory / f"{name}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+def atomic_write(path: Path, data: bytes):
+    """Replace path with data without ever leaving a truncated file behind.
+    
+    The data goes to a temporary file in the same directory, is fsynced and
+    then renamed over the original, which keeps its permission bits.
+    """
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+# Queues with a save still waiting on its timer, flushed at interpreter exit
+_waiting: 'weakref.WeakSet[SaveQueue]' = weakref.WeakSet()
+
+@atexit.register
+def _flush_waiting():
+    # Timers are daemon threads and die with the process, so a change made
+    # just before exit would otherwise never be written
+    for queue in list(_waiting):
+        queue.flush()
+
+class SaveQueue:
+    """Run a save callback on a worker thread once changes stop arriving.
+    
+    Every ``schedule()`` restarts a ``delay`` second timer, so a burst of
+    changes is coalesced into a single save. ``flush()`` runs any pending
+    save immediately on the calling thread and is meant for shutdown or
+    before switching files; saves still pending at interpreter exit are
+    flushed too. Saves never overlap.
+    """
+    
+    def __init__(self, save: Callable[[], bool], delay: float = 0.3):
+        self.save = save
+        self.delay = delay
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+    
+    def schedule(self):
+        """Request a save after the coalescing window"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+            _waiting.add(self)
+    
+    def flush(self) -> bool:
+        """Cancel the timer and save right away"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            _waiting.discard(self)
+        with self._save_lock:
+            return self.save()
+    
+    def _run(self):
+        with self._lock:
+            self._timer = None
+            _waiting.discard(self)
+        with self._save_lock:
+            self.save()
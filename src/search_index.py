@@ -0,0 +1,145 @@
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+def tokenize(text: str) -> Tuple[str, ...]:
+    """Distinct lowercase word tokens of text"""
+    return tuple(set(TOKEN_PATTERN.findall(text.lower())))
+
+class SearchIndex:
+    """Incremental inverted index over task text for filter-as-you-type.
+    
+    Lowercase word tokens map to the set of items containing them. Every
+    query word must match the start of some token in an item; candidate
+    tokens are found by bisecting the sorted vocabulary. Items are added,
+    updated and removed one at a time, never rebuilt. Completion state is
+    kept in the same index so open/done filters combine with text queries.
+    Items can be any hashable object.
+    """
+    OPEN = 'open'
+    DONE = 'done'
+    
+    def __init__(self):
+        self.postings: Dict[str, Set[Hashable]] = {}
+        self.vocabulary: List[str] = []
+        self.tokens: Dict[Hashable, Tuple[str, ...]] = {}
+        self.states = {self.OPEN: set(), self.DONE: set()}
+        # Prefix lookups are reused across keystrokes until the index changes
+        self._prefix_cache: Dict[str, Set[Hashable]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.tokens)
+    
+    def add(self, item: Hashable, text: str, completed: bool):
+        for token in self._index(item, text, completed):
+            insort(self.vocabulary, token)
+        self._prefix_cache.clear()
+    
+    def extend(self, entries: Iterable[Tuple[Hashable, str, bool]]):
+        """Add many (item, text, completed) entries, sorting the vocabulary once"""
+        new_tokens = []
+        for item, text, completed in entries:
+            new_tokens.extend(self._index(item, text, completed))
+        if new_tokens:
+            self.vocabulary.extend(new_tokens)
+            self.vocabulary.sort()
+        self._prefix_cache.clear()
+    
+    def _index(self, item: Hashable, text: str, completed: bool) -> List[str]:
+        """Record item under its tokens, returning tokens new to the vocabulary"""
+        new_tokens = []
+        tokens = tokenize(text)
+        self.tokens[item] = tokens
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = set()
+                new_tokens.append(token)
+            posting.add(item)
+        self.states[self.DONE if completed else self.OPEN].add(item)
+        return new_tokens
+    
+    def remove(self, item: Hashable):
+        tokens = self.tokens.pop(item, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            posting = self.postings[token]
+            posting.discard(item)
+            if not posting:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+        self.states[self.OPEN].discard(item)
+        self.states[self.DONE].discard(item)
+        self._prefix_cache.clear()
+    
+    def update(self, item: Hashable, text: str, completed: bool):
+        """Re-index one item after its text or state changed"""
+        if tokenize(text) != self.tokens.get(item):
+            self.remove(item)
+            self.add(item, text, completed)
+        else:
+            self.set_completed(item, completed)
+    
+    def set_completed(self, item: Hashable, completed: bool):
+        if item not in self.tokens:
+            return
+        self.states[self.OPEN if completed else self.DONE].discard(item)
+        self.states[self.DONE if completed else self.OPEN].add(item)
+    
+    def set_completed_many(self, items: Iterable[Hashable], completed: bool):
+        """Move many indexed items to one state in two set operations"""
+        items = self.tokens.keys() & set(items)
+        self.states[self.OPEN if completed else self.DONE].difference_update(items)
+        self.states[self.DONE if completed else self.OPEN].update(items)
+    
+    def clear(self):
+        self.postings.clear()
+        self.vocabulary.clear()
+        self.tokens.clear()
+        for items in self.states.values():
+            items.clear()
+        self._prefix_cache.clear()
+    
+    def _prefix_matches(self, prefix: str) -> Set[Hashable]:
+        matches = self._prefix_cache.get(prefix)
+        if matches is None:
+            vocabulary = self.vocabulary
+            position = bisect_left(vocabulary, prefix)
+            tokens = []
+            while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+                tokens.append(vocabulary[position])
+                position += 1
+            matches = set().union(*(self.postings[token] for token in tokens))
+            self._prefix_cache[prefix] = matches
+        return matches
+    
+    def match(self, item: Hashable, query: str, state: Optional[str] = None) -> bool:
+        """Whether a single item matches, without touching the posting lists"""
+        tokens = self.tokens.get(item)
+        if tokens is None or (state and item not in self.states[state]):
+            return False
+        return all(any(token.startswith(word) for token in tokens)
+                   for word in TOKEN_PATTERN.findall(query.lower()))
+    
+    def search(self, query: str, state: Optional[str] = None) -> Optional[Set[Hashable]]:
+        """Items matching every word of query and, if given, the state.
+        
+        Returns None when nothing is filtered, meaning every item matches.
+        """
+        words = TOKEN_PATTERN.findall(query.lower())
+        if not words:
+            return set(self.states[state]) if state else None
+        
+        # Intersect starting from the smallest candidate set
+        candidates = sorted((self._prefix_matches(word) for word in set(words)), key=len)
+        if state:
+            candidates.insert(0, self.states[state])
+        matches = set(candidates[0])
+        for other in candidates[1:]:
+            matches &= other
+            if not matches:
+                break
+        return matches
@@ -1,6 +1,9 @@
 import json
 from pathlib import Path
 import os
+import threading
+from save_queue import SaveQueue, atomic_write
+from instrumentation import count, traced
 
 class Settings:
     def __init__(self):
@@ -8,14 +11,25 @@ class Settings:
         self.config_file = self.config_dir / 'settings.json'
         self.settings = {
             'last_file': None,
+            'recent_files': [],
             'window_width': 400,
             'window_height': 600,
             'window_x': None,
             'window_y': None,
-            'always_on_top': False
+            'always_on_top': False,
+            'cascade_completion': False
         }
+        
+        # Changes are coalesced and written behind by the save queue
+        # _changes counts updates and _saved the count last written, so an
+        # update made while a write is running is not marked as saved
+        self._lock = threading.Lock()
+        self._changes = 0
+        self._saved = 0
+        self.save_queue = SaveQueue(self._save_if_dirty, delay=0.5)
         self.load()
     
+    @traced('Settings.load')
     def load(self):
         """Load settings from config file"""
         try:
@@ -26,25 +40,52 @@ class Settings:
         except (json.JSONDecodeError, IOError) as e:
             print(f"Could not load settings: {e}")
     
+    @traced('Settings.save')
     def save(self):
         """Save current settings to config file"""
+        with self._lock:
+            data = json.dumps(self.settings, indent=2).encode('utf-8')
+            changes = self._changes
+        
         try:
             # Create config directory if it doesn't exist
             self.config_dir.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=2)
+            atomic_write(self.config_file, data)
+            count('bytes_written', len(data))
+            with self._lock:
+                self._saved = max(self._saved, changes)
+            return True
         except IOError as e:
             print(f"Could not save settings: {e}")
+            return False
+    
+    def _save_if_dirty(self):
+        if self._saved == self._changes:
+            return True
+        return self.save()
+    
+    def flush(self):
+        """Write pending changes right away, e.g. at shutdown"""
+        return self.save_queue.flush()
     
     def get(self, key, default=None):
         """Get a setting value"""
         return self.settings.get(key, default)
     
     def set(self, key, value):
-        """Set a setting value and save"""
-        self.settings[key] = value
-        self.save()
+        """Set a setting value and schedule a save"""
+        self.update({key: value})
+    
+    def update(self, values):
+        """Set several values at once, scheduling a save only if one changed"""
+        with self._lock:
+            changed = {key: value for key, value in values.items()
+                       if key not in self.settings or self.settings[key] != value}
+            if not changed:
+                return
+            self.settings.update(changed)
+            self._changes += 1
+        self.save_queue.schedule()
     
     def get_last_file(self):
         """Get the last opened file path"""
@@ -57,6 +98,16 @@ class Settings:
         """Set the last opened file path"""
         self.set('last_file', str(file_path) if file_path else None)
     
+    def get_recent_files(self):
+        """Recently opened files and workspaces that still exist, newest first"""
+        return [path for path in self.settings.get('recent_files') or [] if Path(path).exists()]
+    
+    def add_recent_file(self, file_path, limit=10):
+        """Move a file or workspace to the front of the recent list"""
+        path = str(file_path)
+        recent = [path] + [other for other in self.settings.get('recent_files') or [] if other != path]
+        self.set('recent_files', recent[:limit])
+    
     def get_window_geometry(self):
         """Get window geometry settings"""
         return {
@@ -68,13 +119,12 @@ class Settings:
     
     def set_window_geometry(self, width, height, x=None, y=None):
         """Set window geometry settings"""
-        self.settings.update({
+        self.update({
             'window_width': width,
             'window_height': height,
             'window_x': x,
             'window_y': y
         })
-        self.save()
     
     def get_always_on_top(self):
         """Get always on top setting"""
@@ -82,4 +132,12 @@ class Settings:
     
     def set_always_on_top(self, value):
         """Set always on top setting"""
-        self.set('always_on_top', bool(value))
\ No newline at end of file
+        self.set('always_on_top', bool(value))
+    
+    def get_cascade_completion(self):
+        """Whether checking a task also checks the tasks nested under it"""
+        return self.settings.get('cascade_completion', False)
+    
+    def set_cascade_completion(self, value):
+        """Set cascade completion setting"""
+        self.set('cascade_completion', bool(value))
\ No newline at end of file
@@ -0,0 +1,144 @@
+import re
+from array import array
+from bisect import bisect_right
+from datetime import date
+from heapq import heapify, heappop, heappush
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from task_store import TaskStore
+
+DUE_PATTERN = re.compile(r'(?<!\S)due:(\d{4}-\d{2}-\d{2})(?!\S)')
+PRIORITY_PATTERN = re.compile(r'(?<!\S)!(high|medium|med|low|[123])(?!\S)', re.IGNORECASE)
+OWNER_PATTERN = re.compile(r'(?<!\S)@([\w.-]*\w)')
+# Where any of them may start, to find the tasks worth decoding
+TOKEN_PATTERN = re.compile(rb'(?<!\S)(?:due:|!|@)')
+
+# Lower ranks come first; tasks without a priority sort after low
+PRIORITY_RANKS = {'high': 0, '1': 0, 'medium': 1, 'med': 1, '2': 1, 'low': 2, '3': 2}
+PRIORITY_NAMES = ('high', 'medium', 'low')
+NO_PRIORITY = 3
+
+class TaskMetadata(NamedTuple):
+    """Inline tokens of a task line: ``due:YYYY-MM-DD``, ``!high`` and ``@owner``"""
+    due: Optional[date]
+    priority: Optional[str]
+    owners: Tuple[str, ...]
+
+def parse_metadata(text: str) -> TaskMetadata:
+    due = None
+    match = DUE_PATTERN.search(text)
+    if match:
+        try:
+            due = date.fromisoformat(match.group(1))
+        except ValueError:
+            pass
+    priority = None
+    match = PRIORITY_PATTERN.search(text)
+    if match:
+        priority = PRIORITY_NAMES[PRIORITY_RANKS[match.group(1).lower()]]
+    return TaskMetadata(due, priority, tuple(OWNER_PATTERN.findall(text)))
+
+class TaskAgenda:
+    """Open tasks with a due date or priority, ordered for an agenda.
+    
+    Tasks sort by due date (undated last), then priority, then file order.
+    They sit in a binary heap whose entries carry a per-task version;
+    completing or editing a task bumps its version instead of searching
+    the heap, so stale entries are skipped when read and the heap is
+    rebuilt once they make up half of it. ``top(n)`` walks the heap
+    best-first and costs O(n log n) however many tasks there are.
+    """
+    NO_DUE = 0x7fffffff
+    
+    def __init__(self, tasks: TaskStore):
+        self.tasks = tasks
+        count = len(tasks)
+        self.due = array('i', [self.NO_DUE]) * count
+        self.priority = array('B', [NO_PRIORITY]) * count
+        self.versions = array('I', [0]) * count
+        # Whether a task has a live heap entry
+        self.queued = bytearray(count)
+        # Only tasks that have owners get an entry
+        self.owners: Dict[int, Tuple[str, ...]] = {}
+        
+        # Decode only the tasks whose text holds something token-like
+        candidates = set()
+        status_offsets, text_ends = tasks.status_offsets, tasks.text_ends
+        for match in TOKEN_PATTERN.finditer(tasks.content):
+            index = bisect_right(status_offsets, match.start()) - 1
+            if index >= 0 and match.start() < text_ends[index]:
+                candidates.add(index)
+        for index in candidates:
+            self._read(index)
+            self.queued[index] = self._listed(index, tasks.completed[index])
+        self._rebuild()
+    
+    def _read(self, index: int):
+        metadata = parse_metadata(self.tasks.text(index))
+        self.due[index] = metadata.due.toordinal() if metadata.due else self.NO_DUE
+        self.priority[index] = PRIORITY_RANKS[metadata.priority] if metadata.priority else NO_PRIORITY
+        if metadata.owners:
+            self.owners[index] = metadata.owners
+        else:
+            self.owners.pop(index, None)
+    
+    def _listed(self, index: int, completed: bool) -> bool:
+        return not completed and (self.due[index] != self.NO_DUE or self.priority[index] != NO_PRIORITY)
+    
+    def _entry(self, index: int) -> Tuple[int, int, int, int]:
+        return (self.due[index], self.priority[index], index, self.versions[index])
+    
+    def _rebuild(self):
+        queued = self.queued
+        self.heap = [self._entry(index) for index in range(len(queued)) if queued[index]]
+        heapify(self.heap)
+        self.stale = 0
+    
+    def _is_live(self, entry: Tuple[int, int, int, int]) -> bool:
+        return self.versions[entry[2]] == entry[3]
+    
+    def _replace(self, index: int, listed: bool):
+        # The old entry, if any, goes stale; a new one is pushed if needed
+        self.versions[index] += 1
+        if self.queued[index]:
+            self.stale += 1
+        self.queued[index] = listed
+        if listed:
+            heappush(self.heap, self._entry(index))
+        if self.stale * 2 > len(self.heap):
+            self._rebuild()
+    
+    def set_completed(self, index: int, was_completed: bool, completed: bool):
+        """Update the queue after the status of task index changed"""
+        if was_completed != completed:
+            self._replace(index, self._listed(index, completed))
+    
+    def update(self, indices: Iterable[int]):
+        """Re-read the metadata and status of tasks changed in place"""
+        completed = self.tasks.completed
+        for index in indices:
+            self._read(index)
+            self._replace(index, self._listed(index, completed[index]))
+    
+    def metadata(self, index: int) -> TaskMetadata:
+        due = self.due[index]
+        priority = self.priority[index]
+        return TaskMetadata(date.fromordinal(due) if due != self.NO_DUE else None,
+                            PRIORITY_NAMES[priority] if priority != NO_PRIORITY else None,
+                            self.owners.get(index, ()))
+    
+    def sort_key(self, index: int) -> Tuple[int, int]:
+        return (self.due[index], self.priority[index])
+    
+    def top(self, n: int) -> List[int]:
+        """Indices of the first n agenda tasks, in agenda order"""
+        heap = self.heap
+        result = []
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier and len(result) < n:
+            entry, position = heappop(frontier)
+            if self._is_live(entry):
+                result.append(entry[2])
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heappush(frontier, (heap[child], child))
+        return result
@@ -0,0 +1,70 @@
+import gi
+gi.require_version('GObject', '2.0')
+from gi.repository import GObject
+from task_parser import Task, TaskParser
+from task_tree import TaskTree
+
+class TaskItem(GObject.Object):
+    """GObject wrapper exposing a parsed task to Gtk list models.
+    
+    ``parser`` is the TaskParser the task belongs to and ``index`` its
+    position in ``parser.get_tasks()``; the window keeps ``index`` up to
+    date when the model is spliced. Header items title a file's block of
+    tasks in workspace mode and have no index.
+    
+    ``is_root``, ``has_children`` and ``depth`` mirror the task's place in
+    the parser's TaskTree and ``progress`` shows its done/total rollup.
+    """
+    __gtype_name__ = 'TaskItem'
+    
+    text = GObject.Property(type=str, default='')
+    completed = GObject.Property(type=bool, default=False)
+    progress = GObject.Property(type=str, default='')
+    # Number of ancestors; a property so sorted views can order by it
+    depth = GObject.Property(type=int, default=0)
+    
+    def __init__(self, text: str, completed: bool, index: int, parser: TaskParser, is_header: bool = False):
+        super().__init__(text=text, completed=completed)
+        self.index = index
+        self.parser = parser
+        self.is_header = is_header
+        self.is_root = True
+        self.has_children = False
+    
+    @classmethod
+    def from_task(cls, task: Task, index: int, parser: TaskParser) -> 'TaskItem':
+        return cls(task.text, task.completed, index, parser)
+    
+    @classmethod
+    def file_header(cls, title: str, parser: TaskParser) -> 'TaskItem':
+        return cls(title, False, -1, parser, is_header=True)
+    
+    def update_from(self, task: Task):
+        """Copy task state into the item, notifying only what changed"""
+        if self.text != task.text:
+            self.text = task.text
+        if self.completed != task.completed:
+            self.completed = task.completed
+    
+    def update_tree(self, tree: TaskTree) -> bool:
+        """Copy nesting and rollup from the tree.
+        
+        Returns True if the item became or stopped being top-level or
+        expandable, which its row has to be rebuilt for, or moved to
+        another depth, which sorted views have to re-place it for.
+        """
+        index = self.index
+        is_root = tree.parents[index] < 0
+        has_children = tree.has_children(index)
+        progress = f"{tree.done[index]}/{tree.descendant_count(index)}" if has_children else ''
+        if self.progress != progress:
+            self.progress = progress
+        
+        reshaped = (is_root, has_children) != (self.is_root, self.has_children)
+        depth = tree.depths[index]
+        if self.depth != depth:
+            self.depth = depth
+            reshaped = True
+        self.is_root = is_root
+        self.has_children = has_children
+        return reshaped
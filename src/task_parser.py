@@ -1,87 +1,839 @@
+import os
 import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from difflib import SequenceMatcher
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, NamedTuple, Tuple, Optional
+from save_queue import FileIdentity, SaveQueue, atomic_write, file_identity, file_lock
+from task_store import Task, TaskStore
+from task_tree import TaskTree
+from task_sections import TaskSections
+from task_agenda import TaskAgenda
+from parse_cache import ParseCache
+from instrumentation import count, traced
 
-class Task:
-    def __init__(self, text: str, completed: bool, line_number: int, indent: str = ""):
-        self.text = text
-        self.completed = completed
-        self.line_number = line_number
-        self.indent = indent
+# Maps a status byte to its completed flag
+_COMPLETED_STATUS = bytes(byte != ord(' ') for byte in range(256))
+
+def _byte_length(text: str) -> int:
+    """Length of text once encoded as UTF-8"""
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+def _read_bytes(file_path: Path) -> bytearray:
+    """Read a whole file into a single mutable buffer"""
+    return _read_snapshot(file_path)[0]
+
+def _read_snapshot(file_path: Path) -> Tuple[bytearray, FileIdentity]:
+    """Read a whole file along with the identity it had when opened"""
+    with open(file_path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        data = bytearray(st.st_size)
+        del data[f.readinto(data):]
+        # The file may have grown since it was stat'ed
+        data += f.read()
+    count('bytes_read', len(data))
+    return data, (st.st_size, st.st_mtime_ns, st.st_ino)
+
+def _line_map(old: List[bytes], new: List[bytes]) -> Dict[int, int]:
+    """Where each line of old that is unchanged in new ended up there.
+    
+    Lines are only mapped where that is certain. The common head and
+    tail map straight across, except for lines whose text also occurs in
+    the changed stretch between them: any copy of it may be the one that
+    was removed or added there. In that stretch difflib pairs up equal
+    lines, and a pair is kept only if its text occurs once on each side.
+    A line with look-alikes is left out rather than guessed at.
+    """
+    head = 0
+    limit = min(len(old), len(new))
+    while head < limit and old[head] == new[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and old[-1 - tail] == new[-1 - tail]:
+        tail += 1
+    
+    changed = set(old[head:len(old) - tail]) | set(new[head:len(new) - tail])
+    while head and old[head - 1] in changed:
+        head -= 1
+    while tail and old[-tail] in changed:
+        tail -= 1
+    
+    mapping = {number: number for number in range(head)}
+    shift = len(new) - len(old)
+    mapping.update((number, number + shift) for number in range(len(old) - tail, len(old)))
+    
+    old_middle, new_middle = old[head:len(old) - tail], new[head:len(new) - tail]
+    old_counts, new_counts = Counter(old_middle), Counter(new_middle)
+    matcher = SequenceMatcher(None, old_middle, new_middle, autojunk=False)
+    for old_start, new_start, size in matcher.get_matching_blocks():
+        for offset in range(size):
+            line = old_middle[old_start + offset]
+            if old_counts[line] == 1 and new_counts[line] == 1:
+                mapping[head + old_start + offset] = head + new_start + offset
+    return mapping
+
+def _common_prefix(a: bytes, b: bytes, block: int = 1 << 16) -> int:
+    """Length of the common prefix of two buffers, compared block by block"""
+    limit = min(len(a), len(b))
+    start = 0
+    while start + block <= limit and a[start:start + block] == b[start:start + block]:
+        start += block
+    
+    # Bisect inside the first block that differs
+    low, high = start, min(start + block, limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[start:middle] == b[start:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+def _common_suffix(a: bytes, b: bytes, limit: int, block: int = 1 << 16) -> int:
+    """Length of the common suffix of two buffers, at most limit bytes"""
+    end_a, end_b = len(a), len(b)
+    length = 0
+    while length + block <= limit and a[end_a - length - block:end_a - length] == b[end_b - length - block:end_b - length]:
+        length += block
+    
+    low, high = length, min(length + block, limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[end_a - middle:end_a - length] == b[end_b - middle:end_b - length]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+def _at_line_start(content: bytes, offset: int) -> bool:
+    """Check whether offset is the first byte of a line"""
+    return offset == 0 or content[offset - 1] == ord('\n')
+
+class ContentUpdate(NamedTuple):
+    """Rows of a store brought in line with new content by
+    ``TaskParser._diff_content``.
+    
+    Unless ``in_place``, ``removed`` rows starting at ``position`` were
+    replaced by ``added`` ones. Otherwise rows kept their indices and the
+    ones at ``changed`` had the statuses in ``was_completed``. Derived
+    structures rebuilt for the new rows come along when they were built
+    off the thread that owns the tasks.
+    """
+    tasks: TaskStore
+    in_place: bool
+    position: int
+    removed: int
+    added: int
+    changed: List[int]
+    was_completed: bytearray
+    # Whether the nesting may differ, and whether a heading line was edited
+    reshaped: bool
+    headings: bool
+    start_line: int
+    line_shift: int
+    tree: Optional[TaskTree] = None
+    sections: Optional[TaskSections] = None
+    agenda: Optional[TaskAgenda] = None
+
+class DiskSnapshot(NamedTuple):
+    """File content read by ``TaskParser.read_from_disk``, with the identity
+    the parser knew before the read, the one the content was read at and
+    the tasks diffed against it (None if they are unchanged)"""
+    known: Optional[FileIdentity]
+    content: Optional[bytearray]
+    identity: FileIdentity
+    update: Optional[ContentUpdate] = None
+
+class TaskDiff:
+    """Minimal change set between two parses of the same file.
+    
+    Tasks at ``changed`` indices were updated in place. Then ``removed``
+    tasks starting at ``position`` are replaced by ``added``, which maps
+    directly onto a list-model splice. ``reshaped`` is False when the
+    nesting of every task stayed the same, so only the rollups above the
+    changed tasks need refreshing.
+    """
+    def __init__(self, position: int = 0, removed: int = 0,
+                 added: Optional[List[Task]] = None, changed: Optional[List[int]] = None,
+                 reshaped: bool = True):
+        self.position = position
+        self.removed = removed
+        self.added = added or []
+        self.changed = changed or []
+        self.reshaped = reshaped
+    
+    def is_empty(self) -> bool:
+        return not (self.removed or self.added or self.changed)
 
 class TaskParser:
-    TASK_PATTERN = re.compile(r'^(\s*)-\s\[([ x])\]\s(.+)$')
+    # Lines are split on '\n' only and trailing '\r' is stripped before
+    # matching, so the line and buffer engines agree on every file
+    TASK_PATTERN = re.compile(r'^([ \t]*)[-*+][ \t]\[([ xX])\][ \t](.+)$')
+    # The buffer engine finds task lines by the newline in front of them,
+    # which the regex engine skips to instead of trying every byte; only
+    # the first line of a range has none
+    FIRST_LINE_PATTERN = re.compile(rb'[ \t]*[-*+][ \t]\[([ xX])\][ \t]([^\n]*[^\r\n])\r*(?=\n|\Z)')
+    BUFFER_PATTERN = re.compile(b'\n' + FIRST_LINE_PATTERN.pattern)
+    
+    # Files at least this large are parsed with a single regex scan over
+    # the whole buffer instead of line by line
+    BUFFER_ENGINE_THRESHOLD = 256 * 1024
     
-    def __init__(self, file_path: Optional[str] = None):
+    def __init__(self, file_path: Optional[str] = None, parse_cache: Optional[ParseCache] = None):
         self.file_path = Path(file_path) if file_path else None
-        self.tasks: List[Task] = []
-        self.file_lines: List[str] = []
+        # Optional on-disk index cache so unchanged files skip parsing
+        self.parse_cache = parse_cache
+        # Tasks are rows of a columnar store over the raw file bytes
+        self.tasks = TaskStore(bytearray())
+        # Nesting of the tasks, built on first use and dropped when lines change
+        self._tree: Optional[TaskTree] = None
+        # Per-heading done counts, likewise built on first use
+        self._sections: Optional[TaskSections] = None
+        # Due/priority queue of open tasks; survives in-place edits
+        self._agenda: Optional[TaskAgenda] = None
+        
+        # Toggles are written behind: pending maps a status byte offset to
+        # the byte currently on disk at that offset
+        self._lock = threading.RLock()
+        self._pending: Dict[int, int] = {}
+        # Lines added since the last save; they make it a full rewrite
+        self._appended = bytearray()
+        # (line number in _base, line as on disk) of task lines removed
+        # since the last save
+        self._removed: List[Tuple[int, bytes]] = []
+        # Content as it was before the first queued change, which queued
+        # line numbers refer to; a rebased write diffs it against the disk
+        self._base: Optional[bytes] = None
+        # Identity of the file when content was last known to match it
+        # (apart from pending changes); None after writing a rebased copy
+        self._disk_identity: Optional[FileIdentity] = None
+        self.save_queue = SaveQueue(self._write_pending)
     
+    @property
+    def content(self) -> bytearray:
+        """Raw file bytes; status offsets index straight into this buffer"""
+        return self.tasks.content
+    
+    @traced('TaskParser.load_file')
     def load_file(self, file_path: str) -> bool:
         """Load tasks from markdown file"""
+        self.flush()
         try:
             self.file_path = Path(file_path)
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                self.file_lines = f.readlines()
+            content, identity = _read_snapshot(self.file_path)
             
-            self._parse_tasks()
+            tasks = self.parse_cache.load(self.file_path, content) if self.parse_cache else None
+            if tasks is not None:
+                count('parse_cache_hits')
+            else:
+                tasks = self._parse_range(content, 0, len(content), 0)
+                if self.parse_cache:
+                    self.parse_cache.store(self.file_path, tasks)
+            self.tasks = tasks
+            self._tree = None
+            self._sections = None
+            self._agenda = None
+            self._disk_identity = identity
             return True
         except (FileNotFoundError, PermissionError, UnicodeDecodeError) as e:
             print(f"Error loading file: {e}")
             return False
     
     def _parse_tasks(self):
-        """Parse tasks from loaded file lines"""
-        self.tasks.clear()
+        """Parse tasks from the loaded file content"""
+        self.tasks = self._parse_range(self.content, 0, len(self.content), 0)
+    
+    @traced('TaskParser.parse')
+    def _parse_range(self, content: bytearray, start: int, end: int, first_line: int) -> TaskStore:
+        """Parse tasks from the whole lines in content[start:end], where
+        start is on line number first_line"""
+        if len(content) >= self.BUFFER_ENGINE_THRESHOLD:
+            tasks = self._parse_buffer(content, start, end, first_line)
+        else:
+            tasks = self._parse_lines(content, start, end, first_line)
+        count('tasks_parsed', len(tasks))
+        return tasks
+    
+    def _parse_lines(self, content: bytearray, start: int, end: int, first_line: int) -> TaskStore:
+        """Line engine: decode the range and match it one line at a time"""
+        tasks = TaskStore(content)
+        offset = start
         
-        for line_num, line in enumerate(self.file_lines):
-            line = line.rstrip('\n')
+        for line_num, raw_line in enumerate(content[start:end].decode('utf-8').split('\n'), first_line):
+            line = raw_line.rstrip('\r')
             match = self.TASK_PATTERN.match(line)
             
             if match:
-                indent = match.group(1)
                 status = match.group(2)
-                text = match.group(3)
                 completed = status.lower() == 'x'
+                status_offset = offset + _byte_length(line[:match.start(2)])
+                text_end = status_offset + _byte_length(line[match.start(2):match.end(3)])
                 
-                task = Task(text, completed, line_num, indent)
-                self.tasks.append(task)
+                tasks.append(line_num, status_offset, text_end, completed)
+            
+            offset += _byte_length(raw_line) + 1
+        
+        return tasks
+    
+    def _parse_buffer(self, content: bytearray, start: int, end: int, first_line: int) -> TaskStore:
+        """Buffer engine: one regex scan over the raw bytes.
+        
+        Nothing is decoded and no per-line or per-task objects are kept:
+        offsets go straight into the store's columns, line numbers come
+        from counting newlines between matches, and completion flags are
+        read off the status bytes in one pass at the end.
+        """
+        tasks = TaskStore(content)
+        add_line = tasks.line_numbers.append
+        add_status = tasks.status_offsets.append
+        add_end = tasks.text_ends.append
+        count = content.count
+        line_num = first_line
+        position = start
+        text_end = -1
+        
+        match = self.FIRST_LINE_PATTERN.match(content, start, end)
+        if match:
+            text_end = match.end(2)
+            add_line(line_num)
+            add_status(match.start(1))
+            add_end(text_end)
+        for match in self.BUFFER_PATTERN.finditer(content, start, end):
+            newline = match.start()
+            # A task on the line right below the last one needs no counting
+            if newline == text_end:
+                line_num += 1
+            else:
+                line_num += count(b'\n', position, newline) + 1
+            position = newline + 1
+            text_end = match.end(2)
+            add_line(line_num)
+            add_status(match.start(1))
+            add_end(text_end)
+        
+        tasks.completed = bytearray(map(content.__getitem__, tasks.status_offsets)).translate(_COMPLETED_STATUS)
+        return tasks
     
-    def get_tasks(self) -> List[Task]:
+    def store_index(self):
+        """Record the current tasks in the parse cache, e.g. at shutdown
+        after our own writes have changed the file"""
+        if self.parse_cache and self.file_path:
+            with self._lock:
+                self.parse_cache.store(self.file_path, self.tasks)
+    
+    def get_tasks(self) -> TaskStore:
         """Get list of parsed tasks"""
         return self.tasks
     
+    @traced('TaskParser.get_tree')
+    def get_tree(self) -> TaskTree:
+        """Parent/child structure of the tasks with done rollups"""
+        with self._lock:
+            if self._tree is None or len(self._tree) != len(self.tasks):
+                self._tree = TaskTree(self.tasks)
+            return self._tree
+    
+    @traced('TaskParser.get_sections')
+    def get_sections(self) -> TaskSections:
+        """Tasks grouped under their headings with done/total counts"""
+        with self._lock:
+            if self._sections is None or self._sections.total != len(self.tasks):
+                self._sections = TaskSections(self.tasks)
+            return self._sections
+    
+    @traced('TaskParser.get_agenda')
+    def get_agenda(self) -> TaskAgenda:
+        """Open tasks with due dates or priorities, with their metadata"""
+        with self._lock:
+            if self._agenda is None or len(self._agenda.versions) != len(self.tasks):
+                self._agenda = TaskAgenda(self.tasks)
+            return self._agenda
+    
     def update_task_status(self, task_index: int, completed: bool) -> bool:
-        """Update task completion status and save to file"""
-        if not (0 <= task_index < len(self.tasks)):
+        """Update task completion status and queue it for saving.
+        
+        The in-memory state changes immediately; the file is written by
+        the save queue once toggles stop arriving.
+        """
+        return self.update_task_statuses([(task_index, completed)])
+    
+    def update_task_statuses(self, edits: List[Tuple[int, bool]]) -> bool:
+        """Apply several (task index, completed) changes, saved together.
+        
+        Nothing changes if any index is out of range.
+        """
+        with self._lock:
+            tasks = self.tasks
+            if not all(0 <= index < len(tasks) for index, _ in edits):
+                return False
+            
+            # Only status characters change, so the layout stays the same
+            self._keep_base()
+            content = self.content
+            tree = self._tree
+            sections = self._sections
+            agenda = self._agenda
+            for index, completed in edits:
+                status_offset = tasks.status_offsets[index]
+                self._pending.setdefault(status_offset, content[status_offset])
+                was_completed = bool(tasks.completed[index])
+                if tree:
+                    tree.set_completed(index, was_completed, completed)
+                if sections:
+                    sections.set_completed(index, was_completed, completed)
+                tasks.completed[index] = completed
+                content[status_offset] = ord('x') if completed else ord(' ')
+                if agenda:
+                    agenda.set_completed(index, was_completed, completed)
+        
+        if edits:
+            self.save_queue.schedule()
+        return True
+    
+    def set_subtree_status(self, task_index: int, completed: bool) -> List[int]:
+        """Set a task and all tasks nested under it, saved as one write.
+        
+        Returns the indices of the tasks that changed.
+        """
+        with self._lock:
+            if not (0 <= task_index < len(self.tasks)):
+                return []
+            tasks = self.tasks
+            end = self.get_tree().ends[task_index]
+            changed = [index for index in range(task_index, end) if bool(tasks.completed[index]) != completed]
+            self.update_task_statuses([(index, completed) for index in changed])
+            return changed
+    
+    def add_tasks(self, texts: List[str], completed: bool = False) -> TaskDiff:
+        """Append tasks to the end of the file and queue it for saving.
+        
+        The whole file is rewritten by the next save, together with any
+        queued toggles.
+        """
+        with self._lock:
+            self._keep_base()
+            new_content = bytearray(self.content)
+            if new_content and not new_content.endswith(b'\n'):
+                new_content += b'\n'
+            status = 'x' if completed else ' '
+            added = b''.join(f"- [{status}] {text}\n".encode('utf-8') for text in texts)
+            new_content += added
+            diff = self._apply_new_content(new_content)
+            self._appended += added
+        
+        self.save_queue.schedule()
+        return diff
+    
+    def remove_tasks(self, indices: List[int]) -> TaskDiff:
+        """Delete the lines of several tasks and queue the file for saving.
+        
+        Everything is cut in one pass over the content, re-parsed once and
+        written by one save. Tasks nested under a removed task are kept
+        and move up to its parent.
+        """
+        with self._lock:
+            tasks = self.tasks
+            indices = sorted({index for index in indices if 0 <= index < len(tasks)})
+            if not indices:
+                return TaskDiff()
+            
+            self._keep_base()
+            content = self.content
+            appended_start = len(content) - len(self._appended)
+            to_base = self._base_line_mapper()
+            new_content = bytearray()
+            cut_starts, cut_totals = [], []
+            removed = []
+            position = 0
+            for index in indices:
+                status_offset = tasks.status_offsets[index]
+                disk_status = self._pending.pop(status_offset, content[status_offset])
+                line_start, expected = self._line_at(status_offset, disk_status)
+                line_end = line_start + len(expected) + 1
+                if line_start < appended_start:
+                    removed.append((to_base(tasks.line_numbers[index]), expected))
+                new_content += content[position:line_start]
+                position = min(line_end, len(content))
+                cut_starts.append(line_start)
+                cut_totals.append((cut_totals[-1] if cut_totals else 0) + position - line_start)
+            new_content += content[position:]
+            self._removed.extend(removed)
+            
+            # Queued toggles below a removed line move up with the text
+            def shift(offset: int) -> int:
+                cuts = bisect_left(cut_starts, offset)
+                return offset - (cut_totals[cuts - 1] if cuts else 0)
+            self._pending = {shift(offset): status for offset, status in self._pending.items()}
+            if self._appended:
+                self._appended = new_content[shift(appended_start):]
+            diff = self._apply_new_content(new_content)
+        
+        self.save_queue.schedule()
+        return diff
+    
+    def _keep_base(self):
+        # Called before queueing a change; the first one since the last
+        # save records what the change is made against
+        if not (self._pending or self._appended or self._removed):
+            self._base = bytes(self.content)
+    
+    def _base_line_mapper(self) -> Callable[[int], int]:
+        """Map line numbers of content to those of _base, which still has
+        the lines removed since; appended lines come after both"""
+        removed = sorted(line_number for line_number, _ in self._removed)
+        
+        def to_base(line_number: int) -> int:
+            for removed_line in removed:
+                if removed_line > line_number:
+                    break
+                line_number += 1
+            return line_number
+        return to_base
+    
+    def flush(self) -> bool:
+        """Write any queued task updates right away"""
+        return self.save_queue.flush()
+    
+    def is_current(self) -> bool:
+        """Whether nothing is queued and the file still has the identity it
+        had when content was last read or written, so content matches it"""
+        with self._lock:
+            if self._pending or self._appended or self._removed or self._disk_identity is None or not self.file_path:
+                return False
+            return file_identity(self.file_path) == self._disk_identity
+    
+    @traced('TaskParser.write_pending')
+    def _write_pending(self) -> bool:
+        """Write queued toggles, removals and added tasks, runs on the save queue's worker thread.
+        
+        Writes are optimistic: while the file keeps the identity it had
+        when content was read, status bytes are patched in place, or the
+        file is rewritten if lines were added or removed. If it was changed
+        elsewhere, the changes are rebased onto what is on disk instead, so
+        the other edit survives; the file watcher then brings content up
+        to date.
+        """
+        with self._lock:
+            if not self.file_path or not (self._pending or self._appended or self._removed):
+                return True
+            
+            file_path = self.file_path
+            content = self.content
+            tasks = self.tasks
+            # Added lines carry any toggles made on them since
+            appended_start = len(content) - len(self._appended)
+            appended = bytes(content[appended_start:])
+            to_base = self._base_line_mapper()
+            toggles = []
+            for status_offset, disk_status in self._pending.items():
+                status = content[status_offset]
+                if status == disk_status or status_offset >= appended_start:
+                    continue
+                
+                # Remember the whole line as it should be on disk right now
+                line_start, expected = self._line_at(status_offset, disk_status)
+                line_number = to_base(tasks.line_numbers[bisect_left(tasks.status_offsets, status_offset)])
+                toggles.append((line_number, line_start, expected, status_offset - line_start, status))
+            removed = list(self._removed)
+            base = self._base
+            data = bytes(content) if appended or removed else None
+            identity = self._disk_identity
+            self._pending.clear()
+            self._appended.clear()
+            self._removed.clear()
+            self._base = None
+        
+        if not (toggles or appended or removed):
+            return True
+        
+        with file_lock(file_path):
+            if identity is not None and file_identity(file_path) == identity:
+                if data is not None:
+                    written = self._save_file(file_path, data)
+                else:
+                    written = self._patch_statuses(file_path, [(line_start, expected, line_start + column, status)
+                                                               for _, line_start, expected, column, status in toggles])
+                if written:
+                    with self._lock:
+                        if self._disk_identity == identity:
+                            self._disk_identity = file_identity(file_path)
+                    return True
+                if data is not None:
+                    return False
+            
+            with self._lock:
+                self._disk_identity = None
+            return self._write_rebased(file_path, base, toggles, removed, appended)
+    
+    def _line_at(self, status_offset: int, status: int) -> Tuple[int, bytes]:
+        """Start and bytes of the line holding status_offset, with status
+        put in place of its current status character"""
+        content = self.content
+        line_start = content.rfind(b'\n', 0, status_offset) + 1
+        line_end = content.find(b'\n', status_offset)
+        line = bytearray(content[line_start:line_end if line_end >= 0 else len(content)])
+        line[status_offset - line_start] = status
+        return line_start, bytes(line)
+    
+    def _write_rebased(self, file_path: Path, base: bytes, toggles: List[Tuple[int, int, bytes, int, int]],
+                       removed: List[Tuple[int, bytes]], appended: bytes) -> bool:
+        """Apply toggles, removals and added lines to the file as it is on disk now.
+        
+        Toggles and removals carry line numbers in base, the content they
+        were made against. A line diff of base against the disk says where
+        each of those lines is now. Changes whose line was edited or
+        removed elsewhere are dropped, never moved to a look-alike line;
+        the file watcher then reloads the file as it is.
+        """
+        try:
+            disk = _read_bytes(file_path)
+        except (FileNotFoundError, PermissionError) as e:
+            print(f"Error saving file: {e}")
             return False
         
-        task = self.tasks[task_index]
-        task.completed = completed
+        lines = bytes(disk).split(b'\n')
+        moved = _line_map(base.split(b'\n'), lines)
+        starts = []
+        offset = 0
+        for line in lines:
+            starts.append(offset)
+            offset += len(line) + 1
         
-        # Update the corresponding line in file_lines
-        new_status = 'x' if completed else ' '
-        new_line = f"{task.indent}- [{new_status}] {task.text}\n"
+        patches = []
+        deleted = set()
+        dropped = 0
+        for line_number, _, expected, column, status in toggles:
+            number = moved.get(line_number)
+            if number is None or lines[number] != expected:
+                dropped += 1
+                continue
+            lines[number] = expected[:column] + bytes((status,)) + expected[column + 1:]
+            patches.append((starts[number], expected, starts[number] + column, status))
+        for line_number, expected in removed:
+            number = moved.get(line_number)
+            if number is None or lines[number] != expected:
+                dropped += 1
+            else:
+                deleted.add(number)
+        if dropped:
+            print(f"Skipped {dropped} task update(s) whose lines were changed elsewhere")
         
-        if task.line_number < len(self.file_lines):
-            self.file_lines[task.line_number] = new_line
-            return self._save_file()
+        if appended or deleted:
+            data = b'\n'.join(line for number, line in enumerate(lines) if number not in deleted)
+            if appended and data and not data.endswith(b'\n'):
+                data += b'\n'
+            return self._save_file(file_path, data + appended)
+        return not patches or self._patch_statuses(file_path, patches)
+    
+    def _patch_statuses(self, file_path: Path, patches: List[Tuple[int, bytes, int, int]]) -> bool:
+        """Overwrite task status bytes in place.
         
-        return False
+        Every affected line is read back first and nothing is written if
+        any of them no longer matches what was parsed, so callers can fall
+        back to a full rewrite.
+        """
+        try:
+            fd = os.open(file_path, os.O_RDWR)
+            try:
+                for line_start, expected, _, _ in patches:
+                    if os.pread(fd, len(expected), line_start) != expected:
+                        return False
+                
+                for _, _, status_offset, status in patches:
+                    if os.pwrite(fd, bytes((status,)), status_offset) != 1:
+                        return False
+                count('bytes_written', len(patches))
+                return True
+            finally:
+                os.close(fd)
+        except OSError:
+            return False
     
-    def _save_file(self) -> bool:
-        """Save current file_lines back to file"""
-        if not self.file_path:
+    @traced('TaskParser.save_file')
+    def _save_file(self, file_path: Optional[Path] = None, data: Optional[bytes] = None) -> bool:
+        """Atomically save content (or a snapshot of it) back to file"""
+        file_path = file_path or self.file_path
+        if not file_path:
             return False
+        if data is None:
+            data = self.content
         
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                f.writelines(self.file_lines)
+            atomic_write(file_path, data)
+            count('bytes_written', len(data))
             return True
         except (PermissionError, IOError) as e:
             print(f"Error saving file: {e}")
             return False
     
+    @traced('TaskParser.refresh_from_disk')
+    def refresh_from_disk(self) -> Optional[TaskDiff]:
+        """Re-read the file after an external edit and re-parse only the changed lines.
+        
+        Returns the task diff against the previous parse, which is empty
+        if the file is still as last read or written, or None if the file
+        could not be read.
+        """
+        snapshot = self.read_from_disk()
+        if snapshot is None:
+            return None
+        return self.apply_snapshot(snapshot) or TaskDiff()
+    
+    def read_from_disk(self) -> Optional[DiskSnapshot]:
+        """First half of refresh_from_disk, which may run on a worker thread.
+        
+        Flushes queued writes, then reads the file unless it still has the
+        identity it had when last read or written, as after our own saves.
+        Returns None if the file could not be read.
+        """
+        if not self.file_path:
+            return None
+        
+        # Get queued toggles onto disk first so the comparison sees them
+        self.flush()
+        with self._lock:
+            known = self._disk_identity
+        if known is not None and file_identity(self.file_path) == known:
+            count('refresh_skipped')
+            return DiskSnapshot(known, None, known)
+        try:
+            content, identity = _read_snapshot(self.file_path)
+        except (FileNotFoundError, PermissionError, UnicodeDecodeError) as e:
+            print(f"Error reloading file: {e}")
+            return None
+        return DiskSnapshot(known, content, identity, self._prepare_content(content))
+    
+    def apply_snapshot(self, snapshot: DiskSnapshot) -> Optional[TaskDiff]:
+        """Second half of refresh_from_disk, on the thread that owns the tasks.
+        
+        Returns None if tasks were changed or another snapshot was applied
+        since this one was read, in which case it has to be read again.
+        """
+        with self._lock:
+            if self._disk_identity == snapshot.identity:
+                return TaskDiff()
+            if self._disk_identity != snapshot.known or self._pending or self._appended or self._removed:
+                return None
+            self._disk_identity = snapshot.identity
+            return self._commit_content(snapshot.update)
+    
+    def _apply_new_content(self, new_content: bytearray) -> TaskDiff:
+        """Replace content with new bytes, re-parsing only the lines that differ"""
+        return self._commit_content(self._diff_content(self.tasks, new_content))
+    
+    def _diff_content(self, tasks: TaskStore, new_content: bytearray) -> Optional[ContentUpdate]:
+        """Bring a store in line with new content, re-parsing only the
+        lines that differ. Returns None if the content is the same."""
+        old_content = tasks.content
+        
+        # Narrow the edit down to the bytes between the common prefix and
+        # suffix, then widen it to whole lines
+        start = _common_prefix(old_content, new_content)
+        if start == len(old_content) == len(new_content):
+            return None
+        start = old_content.rfind(b'\n', 0, start) + 1
+        
+        suffix = _common_suffix(old_content, new_content, min(len(old_content), len(new_content)) - start)
+        old_end, new_end = len(old_content) - suffix, len(new_content) - suffix
+        if not (_at_line_start(old_content, old_end) and _at_line_start(new_content, new_end)):
+            line_end = old_content.find(b'\n', old_end)
+            grow = (line_end + 1 if line_end >= 0 else len(old_content)) - old_end
+            old_end += grow
+            new_end += grow
+        
+        # Parse the changed range and trim rows that render the same on
+        # both sides so only real changes reach the UI
+        first = bisect_left(tasks.status_offsets, start)
+        last = bisect_left(tasks.status_offsets, old_end)
+        new_rows = self._parse_range(new_content, start, new_end, new_content.count(b'\n', 0, start))
+        
+        head, old_tail, new_tail = 0, last - first, len(new_rows)
+        while head < min(old_tail, new_tail) and tasks.row_key(first + head) == new_rows.row_key(head):
+            head += 1
+        while old_tail > head and new_tail > head and tasks.row_key(first + old_tail - 1) == new_rows.row_key(new_tail - 1):
+            old_tail -= 1
+            new_tail -= 1
+        
+        position = first + head
+        in_place = old_tail == new_tail
+        changed = list(range(position, first + new_tail)) if in_place else []
+        # What the derived structures need to be updated instead of rebuilt
+        was_completed = tasks.completed[position:first + new_tail] if in_place else bytearray()
+        old_indents = [tasks.indent(index) for index in changed]
+        start_line = new_content.count(b'\n', 0, start)
+        
+        # Swap in the new rows and shift the ones after them
+        line_shift = new_content.count(b'\n', start, new_end) - old_content.count(b'\n', start, old_end)
+        tasks.shift(last, line_shift, new_end - old_end)
+        tasks.splice(first, last, new_rows)
+        tasks.content = new_content
+        
+        # An indent change may have moved a task in or out of a subtree
+        reshaped = not in_place or any(tasks.indent(index) != indent for index, indent in zip(changed, old_indents))
+        headings = TaskSections.HEADING_PATTERN
+        headings = bool(headings.search(old_content, start, old_end) or headings.search(new_content, start, new_end))
+        return ContentUpdate(tasks, in_place, position, old_tail - head, new_tail - head, changed,
+                             was_completed, reshaped, headings, start_line, line_shift)
+    
+    def _prepare_content(self, new_content: bytearray) -> Optional[ContentUpdate]:
+        """_diff_content for a thread that doesn't own the tasks.
+        
+        Works on a copy of the store taken under the lock, and rebuilds
+        from it whichever of the tree, sections and agenda exist and the
+        edit invalidates, so the owning thread only swaps them in.
+        """
+        with self._lock:
+            tasks = TaskStore(bytearray(self.content))
+            tasks.splice(0, 0, self.tasks)
+            has_tree, has_sections, has_agenda = (self._tree is not None, self._sections is not None,
+                                                  self._agenda is not None)
+        update = self._diff_content(tasks, new_content)
+        if update is None:
+            return None
+        in_place = update.in_place
+        return update._replace(
+            tree=TaskTree(tasks) if has_tree and update.reshaped else None,
+            sections=TaskSections(tasks) if has_sections and (update.headings or not in_place) else None,
+            agenda=TaskAgenda(tasks) if has_agenda and not in_place else None)
+    
+    def _commit_content(self, update: Optional[ContentUpdate]) -> TaskDiff:
+        """Make an update from _diff_content current and bring the derived
+        structures in step, swapping in the ones it rebuilt"""
+        if update is None:
+            return TaskDiff()
+        tasks = self.tasks
+        if update.tasks is not tasks:
+            tasks.splice(0, len(tasks), update.tasks)
+            tasks.content = update.tasks.content
+        
+        if not update.in_place:
+            self._tree, self._sections, self._agenda = update.tree, update.sections, update.agenda
+            if self._agenda:
+                self._agenda.tasks = tasks
+            added = [tasks[i] for i in range(update.position, update.position + update.added)]
+            return TaskDiff(update.position, update.removed, added)
+        
+        # Tasks kept their indices, so only the changed ones are updated,
+        # unless the nesting or a heading changed
+        tree, sections = self._tree, self._sections
+        if update.reshaped:
+            self._tree, tree = update.tree, None
+        if update.headings:
+            self._sections, sections = update.sections, None
+        elif sections and update.line_shift:
+            sections.shift_lines(update.start_line, update.line_shift)
+        for index, was in zip(update.changed, update.was_completed):
+            completed = bool(tasks.completed[index])
+            if tree:
+                tree.set_completed(index, bool(was), completed)
+            if sections:
+                sections.set_completed(index, bool(was), completed)
+        if self._agenda:
+            self._agenda.update(update.changed)
+        return TaskDiff(changed=update.changed, reshaped=update.reshaped)
+    
     def reload(self) -> bool:
         """Reload tasks from file"""
         if self.file_path and self.file_path.exists():
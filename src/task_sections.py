@@ -0,0 +1,76 @@
+import re
+from array import array
+from bisect import bisect_left
+from typing import List, Tuple
+from task_store import TaskStore
+
+class TaskSections:
+    """Tasks grouped by the markdown heading above them, with done counts.
+    
+    Section 0 holds the tasks above the first heading and has no title.
+    Headings don't nest: an ``##`` heading ends the ``#`` section before
+    it. Tasks are in file order, so each section is a contiguous range of
+    task indices; ``section_of`` maps a task to its section so a status
+    change updates the counters in O(1).
+    """
+    HEADING_PATTERN = re.compile(rb'^ {0,3}(#{1,6})[ \t]+([^\r\n]*)', re.MULTILINE)
+    
+    def __init__(self, tasks: TaskStore):
+        content = tasks.content
+        self.titles = ['']
+        self.levels = array('B', [0])
+        self.line_numbers = array('I', [0])
+        offsets = [0]
+        
+        line_number = 0
+        position = 0
+        for match in self.HEADING_PATTERN.finditer(content):
+            line_number += content.count(b'\n', position, match.start())
+            position = match.start()
+            title = match.group(2).decode('utf-8', errors='replace').rstrip(' \t#')
+            self.titles.append(title)
+            self.levels.append(len(match.group(1)))
+            self.line_numbers.append(line_number)
+            offsets.append(match.start())
+        
+        # Section s holds tasks starts[s] .. starts[s + 1] - 1
+        starts = [bisect_left(tasks.status_offsets, offset) for offset in offsets] + [len(tasks)]
+        self.starts = array('I', starts)
+        self.totals = array('I', [end - start for start, end in zip(starts, starts[1:])])
+        self.done = array('I', [tasks.completed.count(1, start, end) for start, end in zip(starts, starts[1:])])
+        self.section_of = array('I')
+        for section, total in enumerate(self.totals):
+            self.section_of.extend(array('I', [section]) * total)
+        self.done_total = sum(self.done)
+    
+    def __len__(self) -> int:
+        return len(self.titles)
+    
+    @property
+    def total(self) -> int:
+        return len(self.section_of)
+    
+    def task_range(self, section: int) -> range:
+        return range(self.starts[section], self.starts[section + 1])
+    
+    def shift_lines(self, line_number: int, delta: int):
+        """Move the headings at or below line_number after lines were
+        inserted or deleted above them"""
+        line_numbers = self.line_numbers
+        for section in range(1, len(line_numbers)):
+            if line_numbers[section] >= line_number:
+                line_numbers[section] += delta
+    
+    def set_completed(self, index: int, was_completed: bool, completed: bool):
+        """Update the counters after the status of task index changed"""
+        if was_completed == completed:
+            return
+        delta = 1 if completed else -1
+        self.done[self.section_of[index]] += delta
+        self.done_total += delta
+    
+    def entries(self) -> List[Tuple[str, int, int, int, int]]:
+        """(title, level, line number, done, total) of every section,
+        leaving out the untitled one when it has no tasks"""
+        entries = list(zip(self.titles, self.levels, self.line_numbers, self.done, self.totals))
+        return entries if self.totals[0] else entries[1:]
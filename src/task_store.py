@@ -0,0 +1,103 @@
+from array import array
+from typing import Iterator, Tuple
+
+class Task:
+    """Lightweight view of one task row in a TaskStore.
+    
+    Views are created on demand and hold nothing but the store and a row
+    index, so they go stale once rows before them are inserted or removed.
+    """
+    __slots__ = ('_store', '_index')
+    
+    def __init__(self, store: 'TaskStore', index: int):
+        self._store = store
+        self._index = index
+    
+    @property
+    def text(self) -> str:
+        return self._store.text(self._index)
+    
+    @property
+    def completed(self) -> bool:
+        return bool(self._store.completed[self._index])
+    
+    @property
+    def line_number(self) -> int:
+        return self._store.line_numbers[self._index]
+    
+    @property
+    def indent(self) -> str:
+        return self._store.indent(self._index)
+    
+    @property
+    def status_offset(self) -> int:
+        """Absolute byte offset of the status character inside the file"""
+        return self._store.status_offsets[self._index]
+
+class TaskStore:
+    """Columnar storage for the tasks of one file.
+    
+    Each row is a handful of integers: completion flags live in a
+    bytearray, line numbers and offsets in ``array('I')`` columns. Text and
+    indentation are sliced out of the shared ``content`` buffer only when a
+    Task view asks for them. Offsets are 32-bit, so files must be smaller
+    than 4 GiB.
+    """
+    # A task line is: indent, bullet, blank, '[', status, ']', blank, text
+    TEXT_OFFSET = 3
+    
+    def __init__(self, content: bytearray):
+        self.content = content
+        self.completed = bytearray()
+        self.line_numbers = array('I')
+        self.status_offsets = array('I')
+        self.text_ends = array('I')
+    
+    def __len__(self) -> int:
+        return len(self.status_offsets)
+    
+    def __getitem__(self, index: int) -> Task:
+        if index < 0:
+            index += len(self)
+        if not (0 <= index < len(self)):
+            raise IndexError('task index out of range')
+        return Task(self, index)
+    
+    def __iter__(self) -> Iterator[Task]:
+        for index in range(len(self)):
+            yield Task(self, index)
+    
+    def append(self, line_number: int, status_offset: int, text_end: int, completed: bool):
+        self.completed.append(completed)
+        self.line_numbers.append(line_number)
+        self.status_offsets.append(status_offset)
+        self.text_ends.append(text_end)
+    
+    def text(self, index: int) -> str:
+        start = self.status_offsets[index] + self.TEXT_OFFSET
+        return self.content[start:self.text_ends[index]].decode('utf-8', errors='replace')
+    
+    def indent(self, index: int) -> str:
+        status_offset = self.status_offsets[index]
+        line_start = self.content.rfind(b'\n', 0, status_offset) + 1
+        return self.content[line_start:status_offset - self.TEXT_OFFSET].decode('ascii')
+    
+    def row_key(self, index: int) -> Tuple[str, bool, bytes]:
+        """Everything that affects how a row renders, for cheap comparisons"""
+        start = self.status_offsets[index] + self.TEXT_OFFSET
+        return (self.indent(index), self.completed[index], bytes(self.content[start:self.text_ends[index]]))
+    
+    def splice(self, first: int, last: int, rows: 'TaskStore'):
+        """Replace rows[first:last] with all rows of another store"""
+        self.completed[first:last] = rows.completed
+        self.line_numbers[first:last] = rows.line_numbers
+        self.status_offsets[first:last] = rows.status_offsets
+        self.text_ends[first:last] = rows.text_ends
+    
+    def shift(self, first: int, line_shift: int, byte_shift: int):
+        """Move rows[first:] by a number of lines and bytes after an edit above them"""
+        if line_shift:
+            self.line_numbers[first:] = array('I', [n + line_shift for n in self.line_numbers[first:]])
+        if byte_shift:
+            self.status_offsets[first:] = array('I', [n + byte_shift for n in self.status_offsets[first:]])
+            self.text_ends[first:] = array('I', [n + byte_shift for n in self.text_ends[first:]])
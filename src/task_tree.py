@@ -0,0 +1,80 @@
+from array import array
+from typing import Iterator, List
+from task_store import TaskStore
+
+class TaskTree:
+    """Parent/child structure of a TaskStore, derived from indentation.
+    
+    A task's parent is the closest task above it with a smaller indent.
+    Tasks are in file order, so every subtree is the contiguous range
+    ``index + 1 .. ends[index]`` and needs no child lists. ``depths`` counts
+    each task's ancestors. ``done`` caches how many descendants of each
+    task are completed; a status change updates it along the path to the
+    root, in O(depth).
+    """
+    TAB_WIDTH = 4
+    
+    def __init__(self, tasks: TaskStore):
+        count = len(tasks)
+        self.parents = array('i', [-1]) * count
+        self.ends = array('I', [count]) * count
+        self.depths = array('H', [0]) * count
+        
+        content = tasks.content
+        stack = []  # (indent width, index) of the open ancestors
+        for index, status_offset in enumerate(tasks.status_offsets):
+            line_start = content.rfind(b'\n', 0, status_offset) + 1
+            indent = content[line_start:status_offset - TaskStore.TEXT_OFFSET]
+            width = len(indent.expandtabs(self.TAB_WIDTH)) if b'\t' in indent else len(indent)
+            
+            while stack and stack[-1][0] >= width:
+                self.ends[stack.pop()[1]] = index
+            if stack:
+                self.parents[index] = stack[-1][1]
+            self.depths[index] = min(len(stack), 0xffff)
+            stack.append((width, index))
+        
+        # Children come after their parent, so one backwards pass sums subtrees
+        totals = array('I', list(tasks.completed))
+        for index in range(count - 1, -1, -1):
+            parent = self.parents[index]
+            if parent >= 0:
+                totals[parent] += totals[index]
+        self.done = array('I', [total - completed for total, completed in zip(totals, tasks.completed)])
+    
+    def __len__(self) -> int:
+        return len(self.parents)
+    
+    def has_children(self, index: int) -> bool:
+        return self.ends[index] > index + 1
+    
+    def descendant_count(self, index: int) -> int:
+        return self.ends[index] - index - 1
+    
+    def children(self, index: int) -> List[int]:
+        return self._siblings(index + 1, self.ends[index])
+    
+    def roots(self) -> List[int]:
+        return self._siblings(0, len(self))
+    
+    def _siblings(self, first: int, end: int) -> List[int]:
+        # Each child's subtree ends where the next child starts
+        siblings = []
+        while first < end:
+            siblings.append(first)
+            first = self.ends[first]
+        return siblings
+    
+    def ancestors(self, index: int) -> Iterator[int]:
+        parent = self.parents[index]
+        while parent >= 0:
+            yield parent
+            parent = self.parents[parent]
+    
+    def set_completed(self, index: int, was_completed: bool, completed: bool):
+        """Update the rollups above index after its status changed"""
+        if was_completed == completed:
+            return
+        delta = 1 if completed else -1
+        for ancestor in self.ancestors(index):
+            self.done[ancestor] += delta
@@ -0,0 +1,115 @@
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from task_parser import TaskParser
+from parse_cache import ParseCache
+
+class Workspace:
+    """A directory tree of markdown files whose tasks are shown together.
+    
+    Each file keeps its own TaskParser, so toggles are written back to the
+    file they came from and a changed file is re-indexed on its own.
+    ``paths`` lists the indexed files in display order (sorted by path).
+    """
+    SUFFIXES = ('.md', '.markdown')
+    
+    def __init__(self, root: str, parse_cache: Optional[ParseCache] = None, max_workers: Optional[int] = None):
+        self.root = Path(root).resolve()
+        self.parse_cache = parse_cache
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self.parsers: Dict[Path, TaskParser] = {}
+        self.paths: List[Path] = []
+    
+    def is_markdown(self, path) -> bool:
+        """Whether path is a markdown file inside the workspace, outside hidden folders"""
+        path = Path(path)
+        try:
+            relative = path.relative_to(self.root)
+        except ValueError:
+            return False
+        return path.suffix.lower() in self.SUFFIXES and not any(part.startswith('.') for part in relative.parts)
+    
+    def discover(self) -> List[Path]:
+        """Find every markdown file under the root, sorted by path"""
+        found = []
+        for directory, subdirectories, files in os.walk(self.root):
+            # Skip .git, .obsidian and other hidden folders
+            subdirectories[:] = [name for name in subdirectories if not name.startswith('.')]
+            for name in files:
+                if not name.startswith('.') and Path(name).suffix.lower() in self.SUFFIXES:
+                    found.append(Path(directory) / name)
+        return sorted(found)
+    
+    def load(self, path: Path) -> Optional[TaskParser]:
+        """Parse one file; returns None if it can't be read"""
+        parser = TaskParser(parse_cache=self.parse_cache)
+        if parser.load_file(str(path)):
+            # Build the nesting, section counts and agenda here too, off the main loop
+            parser.get_tree()
+            parser.get_sections()
+            parser.get_agenda()
+            return parser
+        return None
+    
+    def index(self, on_batch: Callable[[List[TaskParser]], None], batch_interval: float = 0.1):
+        """Parse every file on a thread pool.
+        
+        Blocks until done, so call it from a worker thread. Parsers are
+        handed to on_batch in path order, in batches at most
+        batch_interval seconds apart; they are not added to the workspace
+        until the caller passes them to ``add()``.
+        """
+        batch = []
+        last_batch = time.monotonic()
+        
+        # concurrent.futures pulls in logging; only pay for it once a
+        # workspace is actually opened
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for parser in executor.map(self.load, self.discover()):
+                if parser:
+                    batch.append(parser)
+                if batch and time.monotonic() - last_batch >= batch_interval:
+                    on_batch(batch)
+                    batch = []
+                    last_batch = time.monotonic()
+        
+        if batch:
+            on_batch(batch)
+    
+    def add(self, parser: TaskParser) -> int:
+        """Add an indexed file and return its position in paths"""
+        path = parser.file_path
+        position = bisect_left(self.paths, path)
+        if position < len(self.paths) and self.paths[position] == path:
+            self.parsers[path] = parser
+            return position
+        
+        self.paths.insert(position, path)
+        self.parsers[path] = parser
+        return position
+    
+    def remove(self, path: Path) -> int:
+        """Drop a file from the workspace and return the position it had"""
+        position = self.paths.index(path)
+        del self.paths[position]
+        parser = self.parsers.pop(path)
+        parser.flush()
+        return position
+    
+    def title(self, path: Path) -> str:
+        return str(path.relative_to(self.root))
+    
+    def task_count(self) -> int:
+        return sum(len(parser.get_tasks()) for parser in self.parsers.values())
+    
+    def done_count(self) -> int:
+        return sum(parser.get_sections().done_total for parser in self.parsers.values())
+    
+    def flush(self):
+        """Write queued toggles of every file"""
+        for parser in self.parsers.values():
+            parser.flush()
@@ -0,0 +1,120 @@
+import ctypes
+import ctypes.util
+from typing import List, Optional
+
+# Constants from X11/X.h
+CLIENT_MESSAGE = 33
+SUBSTRUCTURE_NOTIFY_MASK = 1 << 19
+SUBSTRUCTURE_REDIRECT_MASK = 1 << 20
+XA_ATOM = 4
+XA_WINDOW = 33
+
+# _NET_WM_STATE actions and the source indication for normal applications
+NET_WM_STATE_REMOVE = 0
+NET_WM_STATE_ADD = 1
+SOURCE_APPLICATION = 1
+
+class XClientMessageEvent(ctypes.Structure):
+    _fields_ = [
+        ('type', ctypes.c_int),
+        ('serial', ctypes.c_ulong),
+        ('send_event', ctypes.c_int),
+        ('display', ctypes.c_void_p),
+        ('window', ctypes.c_ulong),
+        ('message_type', ctypes.c_ulong),
+        ('format', ctypes.c_int),
+        ('data', ctypes.c_long * 5),
+    ]
+
+class XEvent(ctypes.Union):
+    # XEvent is padded to 24 longs whatever the event type
+    _fields_ = [('xclient', XClientMessageEvent), ('pad', ctypes.c_long * 24)]
+
+class X11Connection:
+    """Minimal libX11 binding for asking the window manager to change window state.
+    
+    Uses its own display connection through ctypes, so no wmctrl process
+    or python-xlib is needed. Window state requests are root window client
+    messages, as defined by EWMH; any connection to the same display
+    works for them.
+    """
+    
+    def __init__(self, display_name: Optional[str] = None):
+        library = ctypes.util.find_library('X11')
+        if not library:
+            raise OSError('libX11 not found')
+        xlib = ctypes.cdll.LoadLibrary(library)
+        xlib.XOpenDisplay.restype = ctypes.c_void_p
+        xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        xlib.XInternAtom.restype = ctypes.c_ulong
+        xlib.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+        xlib.XSendEvent.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_long, ctypes.POINTER(XEvent)]
+        xlib.XFlush.argtypes = [ctypes.c_void_p]
+        xlib.XGetWindowProperty.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_long, ctypes.c_long, ctypes.c_int,
+            ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_void_p),
+        ]
+        xlib.XFree.argtypes = [ctypes.c_void_p]
+        xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        
+        display = xlib.XOpenDisplay(display_name.encode() if display_name else None)
+        if not display:
+            raise OSError(f'cannot open X display {display_name or ""}'.strip())
+        self.xlib = xlib
+        self.display = display
+        self.root = xlib.XDefaultRootWindow(display)
+    
+    def atom(self, name: str) -> int:
+        return self.xlib.XInternAtom(self.display, name.encode(), False)
+    
+    def set_above(self, window: int, above: bool):
+        """Ask the window manager to add or remove _NET_WM_STATE_ABOVE"""
+        event = XEvent()
+        message = event.xclient
+        message.type = CLIENT_MESSAGE
+        message.send_event = True
+        message.window = window
+        message.message_type = self.atom('_NET_WM_STATE')
+        message.format = 32
+        message.data[0] = NET_WM_STATE_ADD if above else NET_WM_STATE_REMOVE
+        message.data[1] = self.atom('_NET_WM_STATE_ABOVE')
+        message.data[3] = SOURCE_APPLICATION
+        
+        self.xlib.XSendEvent(self.display, self.root, False,
+                             SUBSTRUCTURE_REDIRECT_MASK | SUBSTRUCTURE_NOTIFY_MASK, ctypes.byref(event))
+        self.xlib.XFlush(self.display)
+    
+    def _property(self, window: int, name: str, property_type: int) -> List[int]:
+        """Values of a format 32 window property, empty if unset"""
+        actual_type = ctypes.c_ulong()
+        actual_format = ctypes.c_int()
+        count = ctypes.c_ulong()
+        remaining = ctypes.c_ulong()
+        data = ctypes.c_void_p()
+        status = self.xlib.XGetWindowProperty(
+            self.display, window, self.atom(name), 0, 1024, False, property_type,
+            ctypes.byref(actual_type), ctypes.byref(actual_format), ctypes.byref(count),
+            ctypes.byref(remaining), ctypes.byref(data))
+        if status != 0 or not data.value:
+            return []
+        try:
+            # Format 32 properties are returned as C longs
+            return ctypes.cast(data, ctypes.POINTER(ctypes.c_ulong))[:count.value]
+        finally:
+            self.xlib.XFree(data)
+    
+    def is_above(self, window: int) -> bool:
+        """Whether the window manager reports the window as kept above"""
+        return self.atom('_NET_WM_STATE_ABOVE') in self._property(window, '_NET_WM_STATE', XA_ATOM)
+    
+    def client_windows(self) -> List[int]:
+        """Top-level windows managed by the window manager"""
+        return self._property(self.root, '_NET_CLIENT_LIST', XA_WINDOW)
+    
+    def close(self):
+        if self.display:
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None